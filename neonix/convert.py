@@ -1,74 +1,548 @@
-from __future__ import print_function
+from __future__ import print_function, division
 import os
 import sys
+import time
+import argparse
+import multiprocessing
+import hashlib
+import json
+import logging
+import logging.handlers
+from functools import partial
 import neo
 from datetime import datetime
 from neonix.io.nixio import NixIO
 
 errorfile = "nixio_error.log"
+manifestfile = "nixio_manifest.jsonl"
+# suffix of the names of converted files (see nix_filename)
+nixsuffix = "_nix.h5"
 
+logger = logging.getLogger("neonix.convert")
 
-def main():
-    startmsg = "Starting conversion task at {}".format(
-        datetime.now().isoformat())
-    printerr("-"*len(startmsg))
-    printerr(startmsg)
-    printerr("-"*len(startmsg))
-    if "-v" in sys.argv:
-        verbose = True
-    else:
-        verbose = False
-    for datafilename in [f for f in os.listdir(".") if os.path.isfile(f)]:
-        print("Processing {}".format(datafilename))
-        try:
-            reader = neo.io.get_io(datafilename)
-            print("File type: {}".format(reader.name))
-            data = reader.read()
-        except OSError:
-            printerr("NOTICE: file {} does not have an extension "
-                     "known to Neo.".format(datafilename))
-            continue
-        except ImportError as ie:
-            printerr("ERROR importing reader for file {}.".format(datafilename))
-            printerr("      {}".format(ie))
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description="Convert all files readable by Neo in a directory to "
+                    "NIX files.",
+        epilog="NIX files are read lazily and written one data object at a "
+               "time. Files of formats whose Neo IO reads Segments are "
+               "written one Segment at a time. Other files are read into "
+               "memory as a whole."
+    )
+    parser.add_argument("inputdir", nargs="?", default=".",
+                        help="directory containing the files to convert "
+                             "(default: current directory)")
+    parser.add_argument("-o", "--output", default=None,
+                        help="directory for the NIX files "
+                             "(default: the input directory)")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="number of files converted in parallel")
+    parser.add_argument("-m", "--manifest", default=None,
+                        help="manifest of converted files used to skip "
+                             "unchanged files on reruns (default: {} in the "
+                             "output directory)".format(manifestfile))
+    parser.add_argument("-f", "--force", action="store_true",
+                        help="convert all files, even if the manifest lists "
+                             "them as converted and unchanged")
+    parser.add_argument("-l", "--log", default=errorfile,
+                        help="log file receiving one record per file "
+                             "(default: {})".format(errorfile))
+    parser.add_argument("--log-json", action="store_true",
+                        help="write the log as JSON lines")
+    parser.add_argument("-v", dest="verbose", action="store_true",
+                        help="print the structure of each converted file")
+    args = parser.parse_args(args)
+    outputdir = args.output if args.output is not None else args.inputdir
+    if not os.path.isdir(outputdir):
+        os.makedirs(outputdir)
+    manifestpath = args.manifest
+    if manifestpath is None:
+        manifestpath = os.path.join(outputdir, manifestfile)
+    manifest = dict() if args.force else load_manifest(manifestpath)
+
+    loghandler = setup_logging(args.log, args.log_json)
+    logger.info("Starting conversion task at {}".format(
+        datetime.now().isoformat()))
+    datafilenames = input_files(args.inputdir, manifest,
+                                (manifestpath, args.log))
+    tasks = [(f, outputdir, args.verbose, manifest.get(f))
+             for f in datafilenames]
+    starttime = time.time()
+    results = list()
+    try:
+        with open(manifestpath, "a") as manifestfd:
+            if args.jobs > 1:
+                pool = multiprocessing.Pool(args.jobs, maxtasksperchild=1)
+                taskresults = pool.imap_unordered(_convert_task, tasks)
+            else:
+                pool = None
+                taskresults = (_convert_task(task) for task in tasks)
+            try:
+                for record, outcome, info in taskresults:
+                    if record != manifest.get(record["source"]):
+                        manifestfd.write(json.dumps(record) + "\n")
+                        manifestfd.flush()
+                    log_conversion(record, outcome, info)
+                    results.append((record, outcome))
+            finally:
+                if pool is not None:
+                    pool.close()
+                    pool.join()
+        print_summary(results, time.time() - starttime)
+    finally:
+        logger.removeHandler(loghandler)
+        filehandler = loghandler.target
+        loghandler.close()
+        filehandler.close()
+
+
+def input_files(inputdir, manifest=None, exclude=()):
+    """
+    Returns the absolute paths of the files in ``inputdir`` to convert.
+    NIX files written by the converter (files named like the output of
+    ``nix_filename`` and the outputs listed in the manifest) and the files
+    in ``exclude`` are left out.
+
+    :param inputdir: Directory containing the files to convert
+    :param manifest: Dictionary of the manifest records by source path
+    :param exclude: Paths of other files to leave out (e.g., the log file)
+    :return: Sorted list of paths
+    """
+    exclude = set(os.path.abspath(f) for f in exclude)
+    if manifest:
+        exclude.update(os.path.abspath(record["output"])
+                       for record in manifest.values() if record["output"])
+    datafilenames = list()
+    for filename in sorted(os.listdir(inputdir)):
+        datafilename = os.path.abspath(os.path.join(inputdir, filename))
+        if not os.path.isfile(datafilename) or datafilename in exclude:
             continue
-        except Exception as exc:
-            printerr("ERROR reading file {}.".format(datafilename))
-            printerr("      {}".format(exc))
+        if filename.endswith(nixsuffix):
             continue
-        blocks = []
-        try:
-            blkiter = iter(data)
-        except TypeError:
-            blkiter = iter([data])
-        for item in blkiter:
-            if isinstance(item, neo.core.Block):
-                # filter out non-blocks
-                blocks.append(item)
-        if blocks:
-            if verbose:
-                print_neo(blocks)
-            nixfilename = datafilename.replace(".", "_")+"_nix.h5"
-            nixio = None
+        datafilenames.append(datafilename)
+    return datafilenames
+
+
+def setup_logging(logfile=errorfile, jsonlines=False, capacity=1024):
+    """
+    Adds a handler writing to ``logfile`` to the conversion logger.
+    Records are buffered in memory and written ``capacity`` records at a time
+    and when the handler is closed.
+
+    :param logfile: Path of the log file. Records are appended.
+    :param jsonlines: Write each record as a line of JSON
+    :param capacity: Number of records buffered before they are written
+    :return: The buffering handler
+    """
+    filehandler = logging.FileHandler(logfile, delay=True)
+    if jsonlines:
+        filehandler.setFormatter(JSONLinesFormatter())
+    else:
+        filehandler.setFormatter(
+            logging.Formatter("%(asctime)s %(levelname)s %(message)s")
+        )
+    handler = logging.handlers.MemoryHandler(
+        capacity, flushLevel=logging.CRITICAL, target=filehandler
+    )
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    logger.addHandler(handler)
+    return handler
+
+
+class JSONLinesFormatter(logging.Formatter):
+    """
+    Formats log records as one JSON object per line. The fields of per-file
+    conversion records (see ``log_conversion``) are keys of the object; other
+    records have a 'message' key.
+    """
+
+    def format(self, record):
+        entry = {"time": datetime.fromtimestamp(record.created).isoformat(),
+                 "level": record.levelname}
+        conversion = getattr(record, "conversion", None)
+        if conversion is not None:
+            entry.update(conversion)
+        else:
+            entry["message"] = record.getMessage()
+        return json.dumps(entry)
+
+
+def log_conversion(record, outcome, info):
+    """
+    Logs the result of the conversion of one file.
+
+    :param record: Manifest record of the file
+    :param outcome: Outcome of the conversion task
+    :param info: Dictionary with the ``duration`` of the task and the error
+     and notice ``messages`` reported during the conversion
+    """
+    fields = {"source": record["source"], "output": record["output"],
+              "outcome": outcome, "size": record["size"],
+              "duration": round(info["duration"], 3),
+              "messages": info["messages"]}
+    message = "{source}: {outcome} ({size} bytes, {duration:.2f} s)".format(
+        **fields)
+    for line in info["messages"]:
+        message += "\n    " + line
+    level = logging.ERROR if outcome == "failed" else logging.INFO
+    logger.log(level, message, extra={"conversion": fields})
+
+
+def _convert_task(task):
+    """
+    Converts a file in a worker process unless the manifest record of a
+    previous run shows it was converted and has not changed since.
+    Unexpected errors are reported as a failed conversion, so that one file
+    cannot stop the others.
+
+    :param task: Tuple of the arguments of ``convert_file`` and the manifest
+     record of the file or None
+    :return: Tuple of the manifest record of the file, the outcome of the
+     task ('unchanged' or the result of ``convert_file``), and a dictionary
+     with the ``duration`` of the task and the reported ``messages``
+    """
+    datafilename, outputdir, verbose, previous = task
+    starttime = time.time()
+    info = {"messages": list()}
+    record = file_record(datafilename)
+    nixfilename = nix_filename(datafilename, outputdir)
+    if previous is not None and previous["status"] == "converted" and\
+            previous["output"] == nixfilename and\
+            os.path.exists(nixfilename):
+        if (record["size"], record["mtime"]) !=\
+                (previous["size"], previous["mtime"]):
+            record["digest"] = file_digest(datafilename)
+        else:
+            record["digest"] = previous["digest"]
+        if record["digest"] == previous["digest"]:
+            print("File {} is unchanged. Skipping.".format(datafilename))
+            record["output"] = previous["output"]
+            record["status"] = previous["status"]
+            info["duration"] = time.time() - starttime
+            return record, "unchanged", info
+    try:
+        status, nixfilename = convert_file(datafilename, outputdir, verbose,
+                                           info["messages"])
+    except Exception as exc:
+        printerr("ERROR: The following unexpected error occurred during"
+                 " conversion of file {}.".format(datafilename),
+                 info["messages"])
+        printerr("       {}".format(exc), info["messages"])
+        status, nixfilename = "failed", None
+    if status == "converted" and record["digest"] is None:
+        record["digest"] = file_digest(datafilename)
+    record["status"] = status
+    record["output"] = nixfilename
+    info["duration"] = time.time() - starttime
+    return record, status, info
+
+
+def nix_filename(datafilename, outputdir):
+    """
+    Returns the path of the NIX file a file is converted to.
+    """
+    return os.path.join(
+        outputdir, os.path.basename(datafilename).replace(".", "_")+nixsuffix
+    )
+
+
+def file_record(datafilename):
+    """
+    Returns a new manifest record for a file.
+    The ``digest``, ``output``, and ``status`` of the record are None.
+
+    :param datafilename: Path of the file
+    :return: Dictionary with the keys ``source``, ``size``, ``mtime``,
+     ``digest``, ``output``, and ``status``
+    """
+    stat = os.stat(datafilename)
+    return {"source": datafilename, "size": stat.st_size,
+            "mtime": stat.st_mtime, "digest": None, "output": None,
+            "status": None}
+
+
+def file_digest(datafilename, blocksize=1 << 20):
+    """
+    Computes the MD5 sum of the contents of a file.
+
+    :param datafilename: Path of the file
+    :param blocksize: Number of bytes read at a time
+    :return: Hex digest
+    """
+    digest = hashlib.md5()
+    with open(datafilename, "rb") as datafile:
+        for block in iter(lambda: datafile.read(blocksize), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_manifest(manifestpath):
+    """
+    Reads the manifest of previous conversions.
+
+    The manifest holds one JSON record per line (see ``file_record``) and is
+    appended to as files are converted, so an interrupted run keeps the
+    records of the files it completed. The last record of each file counts.
+    Incomplete lines left by an interrupted run are ignored. Manifests with
+    superseded records are rewritten with only the current ones.
+
+    :param manifestpath: Path of the manifest file
+    :return: Dictionary of the records by source path
+    """
+    manifest = dict()
+    if not os.path.exists(manifestpath):
+        return manifest
+    nlines = 0
+    with open(manifestpath) as manifestfd:
+        for line in manifestfd:
+            nlines += 1
             try:
-                print("Writing data to {}".format(nixfilename))
-                nixio = NixIO(nixfilename, mode="ow")
-                nixio.write_all_blocks(blocks)
-                print("DONE: file {} converted and saved to {}".
-                      format(datafilename, nixfilename))
-            except RuntimeError as re:
-                printerr("ERROR creating file {}".format(nixfilename))
-                printerr("      {}".format(re))
-            except Exception as exc:
-                printerr("ERROR: The following unexpected error occurred during"
-                         " conversion of file {}.".format(datafilename))
-                printerr("       {}".format(exc))
-            finally:
-                if nixio:
-                    del nixio
+                record = json.loads(line)
+            except ValueError:
+                continue
+            manifest[record["source"]] = record
+    if nlines > len(manifest):
+        tmppath = manifestpath + ".tmp"
+        with open(tmppath, "w") as manifestfd:
+            for record in manifest.values():
+                manifestfd.write(json.dumps(record) + "\n")
+        if os.path.exists(manifestpath):
+            os.remove(manifestpath)
+        os.rename(tmppath, manifestpath)
+    return manifest
+
+
+def convert_file(datafilename, outputdir=".", verbose=False, messages=None):
+    """
+    Reads a file with the Neo IO matching its extension and writes its Blocks
+    to a NIX file in ``outputdir``.
+
+    NIX files are read lazily with the NixIO and each data object is loaded
+    only while it is being written, so that the whole recording is never held
+    in memory. Files of IOs that read Segments (and not Blocks) are read and
+    written one Segment at a time (see ``write_segments``). The IOs of Neo 0.5
+    for other formats cannot load parts of a file individually; those files
+    are read completely.
+
+    :param datafilename: Path of the file to convert
+    :param outputdir: Directory for the NIX file
+    :param verbose: Print the structure of the Blocks read from the file
+    :param messages: List to which reported errors and notices are added
+    :return: Tuple of the result of the conversion ('converted', 'skipped',
+     or 'failed') and the path of the NIX file (None if it was not written)
+    """
+    print("Processing {}".format(datafilename))
+    reader = None
+    try:
+        reader = open_reader(datafilename)
+        print("File type: {}".format(reader.name))
+        loader = None
+        if isinstance(reader, NixIO):
+            # loaded objects are not kept by the reader
+            loader = partial(reader.load_lazy_object, register=False)
+            data = reader.read(lazy=True)
+        elif reads_segments(reader):
+            # segments are read while writing
+            data = None
         else:
-            print("File does not contain Blocks. Skipping.")
-        print()
+            data = reader.read()
+    except OSError:
+        printerr("NOTICE: file {} does not have an extension "
+                 "known to Neo.".format(datafilename), messages)
+        close_reader(reader)
+        return "skipped", None
+    except ImportError as ie:
+        printerr("ERROR importing reader for file {}.".format(datafilename),
+                 messages)
+        printerr("      {}".format(ie), messages)
+        close_reader(reader)
+        return "failed", None
+    except Exception as exc:
+        printerr("ERROR reading file {}.".format(datafilename), messages)
+        printerr("      {}".format(exc), messages)
+        close_reader(reader)
+        return "failed", None
+    try:
+        if data is None:
+            return write_segments(reader, datafilename, outputdir, verbose,
+                                  messages)
+        return write_blocks(data, datafilename, outputdir, verbose, loader,
+                            messages)
+    finally:
+        # lazily read objects are loaded from the reader while writing
+        close_reader(reader)
+
+
+def write_blocks(data, datafilename, outputdir=".", verbose=False,
+                 loader=None, messages=None):
+    """
+    Writes the Blocks in the data read from a file to a NIX file in
+    ``outputdir``.
+
+    :param data: Block or list of objects read from ``datafilename``
+    :param datafilename: Path of the file the data was read from
+    :param outputdir: Directory for the NIX file
+    :param verbose: Print the structure of the Blocks
+    :param loader: Function loading the lazily read objects (see
+     ``NixIO.write_all_blocks``)
+    :param messages: List to which reported errors and notices are added
+    :return: Tuple of the result and the path of the NIX file, as returned by
+     ``convert_file``
+    """
+    blocks = []
+    try:
+        blkiter = iter(data)
+    except TypeError:
+        blkiter = iter([data])
+    for item in blkiter:
+        if isinstance(item, neo.core.Block):
+            # filter out non-blocks
+            blocks.append(item)
+    if not blocks:
+        print("File does not contain Blocks. Skipping.")
+        return "skipped", None
+    if verbose:
+        print_neo(blocks)
+    nixfilename = nix_filename(datafilename, outputdir)
+    nixio = None
+    status = "failed"
+    try:
+        print("Writing data to {}".format(nixfilename))
+        nixio = NixIO(nixfilename, mode="ow")
+        nixio.write_all_blocks(blocks, loader=loader)
+        print("DONE: file {} converted and saved to {}".
+              format(datafilename, nixfilename))
+        status = "converted"
+    except RuntimeError as re:
+        printerr("ERROR creating file {}".format(nixfilename), messages)
+        printerr("      {}".format(re), messages)
+    except Exception as exc:
+        printerr("ERROR: The following unexpected error occurred during"
+                 " conversion of file {}.".format(datafilename), messages)
+        printerr("       {}".format(exc), messages)
+    finally:
+        if nixio:
+            nixio.nix_file.close()
+    return status, nixfilename
+
+
+def reads_segments(reader):
+    """
+    Returns True if a Neo IO reads files as Segments instead of Blocks. The
+    ``read`` method of such IOs wraps the Segment read by ``read_segment`` in
+    a new Block.
+    """
+    return (neo.core.Segment in reader.readable_objects and
+            neo.core.Block not in reader.readable_objects)
+
+
+def read_segments(reader):
+    """
+    Yields the Segments of a file read by an IO for which ``reads_segments``
+    is True, one at a time. The IOs of Neo 0.5 read one Segment per file.
+
+    :param reader: Neo IO
+    """
+    yield reader.read_segment(lazy=False, cascade=True)
+
+
+def write_segments(reader, datafilename, outputdir=".", verbose=False,
+                   messages=None):
+    """
+    Reads the Segments of a file one at a time (see ``read_segments``) and
+    writes each to a NIX file in ``outputdir`` before reading the next. Like
+    ``BaseIO.read``, the Segments are stored in a Block named
+    'One segment only'.
+
+    :param reader: Neo IO for which ``reads_segments`` is True
+    :param datafilename: Path of the file read by ``reader``
+    :param outputdir: Directory for the NIX file
+    :param verbose: Print the structure of each Segment
+    :param messages: List to which reported errors and notices are added
+    :return: Tuple of the result and the path of the NIX file, as returned by
+     ``convert_file``
+    """
+    nixfilename = nix_filename(datafilename, outputdir)
+    nixio = None
+    status = "failed"
+    try:
+        print("Writing data to {}".format(nixfilename))
+        nixio = NixIO(nixfilename, mode="ow")
+        for seg in read_segments(reader):
+            if verbose:
+                block = neo.core.Block(name="One segment only")
+                block.segments.append(seg)
+                print_neo([block])
+            nixio.append_segment(seg, "One segment only")
+        print("DONE: file {} converted and saved to {}".
+              format(datafilename, nixfilename))
+        status = "converted"
+    except RuntimeError as re:
+        printerr("ERROR creating file {}".format(nixfilename), messages)
+        printerr("      {}".format(re), messages)
+    except Exception as exc:
+        printerr("ERROR: The following unexpected error occurred during"
+                 " conversion of file {}.".format(datafilename), messages)
+        printerr("       {}".format(exc), messages)
+    finally:
+        if nixio:
+            nixio.nix_file.close()
+    return status, nixfilename
+
+
+def close_reader(reader):
+    """
+    Closes the file of a reader returned by ``open_reader``. Only the NixIO
+    keeps its file open after reading.
+    """
+    if isinstance(reader, NixIO):
+        reader.nix_file.close()
+
+
+def open_reader(datafilename):
+    """
+    Returns a Neo IO for reading a file, chosen by its extension like
+    ``neo.io.get_io``. NIX files are opened read-only with the NixIO of this
+    package.
+
+    :param datafilename: Path of the file
+    :return: Neo IO instance
+    """
+    extension = os.path.splitext(datafilename)[1][1:]
+    if extension in NixIO.extensions:
+        return NixIO(datafilename, mode="ro")
+    return neo.io.get_io(datafilename)
+
+
+def print_summary(results, duration):
+    """
+    Prints and logs the number of converted, unchanged, skipped, and failed
+    files and the conversion throughput.
+
+    :param results: List of the manifest records and task outcomes
+    :param duration: Wall clock time of the conversion in seconds
+    """
+    counts = dict((outcome, 0) for outcome in ("converted", "unchanged",
+                                               "skipped", "failed"))
+    nbytes = 0
+    for record, outcome in results:
+        counts[outcome] += 1
+        if outcome == "converted":
+            nbytes += record["size"]
+    duration = max(duration, 1e-6)
+    lines = [
+        "Converted {} of {} files ({} unchanged, {} skipped, {} failed) "
+        "in {:.1f} s".format(counts["converted"], len(results),
+                             counts["unchanged"], counts["skipped"],
+                             counts["failed"], duration),
+        "Throughput: {:.2f} files/s, {:.2f} MB/s".format(
+            counts["converted"] / duration, nbytes / duration / 1e6)
+    ]
+    for line in lines:
+        print(line)
+        logger.info(line)
 
 
 def print_neo(blocks):
@@ -98,9 +572,14 @@ def print_neo(blocks):
                           format(stidx, st.name))
 
 
-def printerr(message):
-    with open(errorfile, "a") as logfile:
-        print(message, file=logfile)
+def printerr(message, messages=None):
+    """
+    Prints an error or notice to stderr and adds it to ``messages``, the
+    messages of the file being converted. They are written to the log file
+    with the record of the file.
+    """
+    if messages is not None:
+        messages.append(message)
     print(message, file=sys.stderr)
 
 
@@ -12,10 +12,13 @@ from __future__ import absolute_import, print_function
 import os
 import time
 from datetime import datetime
-from collections import Iterable
+from collections import Iterable, OrderedDict, Counter, deque
 import itertools
+import threading
+from contextlib import contextmanager
+from multiprocessing.pool import ThreadPool
 from six import string_types
-from hashlib import md5
+import hashlib
 
 import quantities as pq
 import numpy as np
@@ -32,6 +35,11 @@ except ImportError:
                       "The NixIO requires the Python bindings for NIX "
                       "(nixio on PyPi).")
 
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
 
 def stringify(value):
     if value is None:
@@ -100,11 +108,59 @@ class NixIO(BaseIO):
         "units": "sources"
     }
 
-    def __init__(self, filename, mode="ro"):
+    _storage_option_names = ("compression", "compression_opts",
+                             "shuffle", "chunks")
+    # target size of automatically shaped dataset chunks
+    _chunk_bytes = 1 << 20
+    # hash backends in order of preference
+    _hash_backends = ("xxhash", "blake2b", "md5")
+    # maximum size of the blocks of non-contiguous arrays copied for hashing
+    _hash_chunk_bytes = 1 << 22
+    # ChannelIndex metadata properties of the 'compact' channel layout
+    _compact_channel_props = ("channels.index", "channels.names",
+                              "channels.coordinates",
+                              "channels.coordinates.units")
+
+    def __init__(self, filename, mode="ro", signal_layout="split",
+                 compression=None, compression_opts=None, shuffle=False,
+                 chunks=None, mmap=False, hash_backend=None, stats=False,
+                 channel_layout="sources"):
         """
         Initialise IO instance and NIX file.
 
+        The storage options (``compression``, ``compression_opts``,
+        ``shuffle``, ``chunks``) apply to the datasets of all signals, times,
+        durations and waveforms written by this IO. When none is set, the NIX
+        library defaults are used.
+
         :param filename: Full path to the file
+        :param mode: File mode: 'ro' (ReadOnly), 'rw' (ReadWrite), or
+         'ow' (Overwrite)
+        :param signal_layout: Storage layout for newly written signals:
+         'split' stores one DataArray per channel, 'single' stores one 2-D
+         (time x channel) DataArray per signal. Both layouts are read.
+        :param compression: HDF5 compression filter: 'gzip', 'lzf', or None
+        :param compression_opts: Options for the compression filter (e.g., the
+         gzip level)
+        :param shuffle: Enable the HDF5 shuffle filter
+        :param chunks: Chunk length along the first (time) axis as an int, or
+         a full chunk shape tuple. A tuple only applies to datasets with as
+         many axes; the others use the default chunk shape.
+         By default, chunks span all other axes and hold about 1 MiB.
+         False stores datasets contiguously, without filters.
+        :param mmap: Return signals stored contiguously and uncompressed in a
+         single DataArray as read-only views of a memory map of the file
+         instead of copying their data into memory
+        :param hash_backend: Hash function used to detect modified objects
+         when writing: 'xxhash', 'blake2b', or 'md5'. By default, the first
+         one available in that order is used.
+        :param stats: Collect operation counts and timings in ``self.stats``
+         (see ``collect_stats``)
+        :param channel_layout: Storage layout for the channels of newly
+         written ChannelIndex objects: 'sources' stores one NIX Source per
+         channel, 'compact' stores the indices, names, and coordinates of all
+         channels as array properties of the ChannelIndex metadata. Both
+         layouts are read.
         """
         BaseIO.__init__(self, filename)
         self.filename = filename
@@ -118,11 +174,46 @@ class NixIO(BaseIO):
             raise ValueError("Invalid mode specified '{}'. "
                              "Valid modes: 'ro' (ReadOnly)', 'rw' (ReadWrite), "
                              "'ow' (Overwrite).".format(mode))
+        if signal_layout not in ("split", "single"):
+            raise ValueError("Invalid signal layout specified '{}'. "
+                             "Valid layouts: 'split', 'single'.".format(
+                                 signal_layout))
+        self.signal_layout = signal_layout
+        if channel_layout not in ("sources", "compact"):
+            raise ValueError("Invalid channel layout specified '{}'. "
+                             "Valid layouts: 'sources', 'compact'.".format(
+                                 channel_layout))
+        self.channel_layout = channel_layout
+        self._storage_options = self._check_storage_options({
+            "compression": compression,
+            "compression_opts": compression_opts,
+            "shuffle": shuffle,
+            "chunks": chunks
+        })
+        self.mmap = mmap
+        if hash_backend is None:
+            hash_backend = self._default_hash_backend()
+        self._hash_factory(hash_backend)
+        self.hash_backend = hash_backend
         self.nix_file = nixio.File.open(self.filename, filemode, backend="h5py")
         self._object_map = dict()
-        self._lazy_loaded = list()
+        self._path_map = dict()
+        self._path_cache_stats = {"hits": 0, "misses": 0}
+        # marks threads resolving a path, whose parents are resolved nested
+        self._path_resolving = threading.local()
+        self._lazy_loaded = dict()
+        self._referer_index = dict()
         self._object_hashes = dict()
+        self._prepared = dict()
+        self._prepare_queue = deque()
+        self._prepare_pool = None
+        self._prepare_limit = 0
+        self._section_cache = dict()
+        self._loader = None
+        self._map_objects = True
         self._block_read_counter = 0
+        self._stats_lock = threading.Lock()
+        self.stats = self._new_stats() if stats else None
 
     def read_all_blocks(self, cascade=True, lazy=False):
         blocks = list()
@@ -173,17 +264,9 @@ class NixIO(BaseIO):
         neo_rcg.block = neo_parent
         return neo_rcg
 
-    def read_signal(self, path, lazy=False):
-        nix_data_arrays = list()
-        parent_group = self._get_parent(path)
-        parent_container = parent_group.data_arrays
-        signal_group_name = path.split("/")[-1]
-        for idx in itertools.count():
-            signal_name = "{}.{}".format(signal_group_name, idx)
-            if signal_name in parent_container:
-                nix_data_arrays.append(parent_container[signal_name])
-            else:
-                break
+    def read_signal(self, path, lazy=False, t_start=None, t_stop=None,
+                    channels=None):
+        nix_data_arrays = self._get_object_at(path)
         # check metadata segment
         group_section = nix_data_arrays[0].metadata
         for da in nix_data_arrays:
@@ -191,39 +274,97 @@ class NixIO(BaseIO):
                 "DataArray {} is not a member of signal group {}".format(
                     da.name, group_section.name
                 )
-        neo_signal = self._signal_da_to_neo(nix_data_arrays, lazy)
+        neo_signal = self._signal_da_to_neo(nix_data_arrays, lazy,
+                                            t_start, t_stop, channels)
         neo_signal.path = path
-        if self._find_lazy_loaded(neo_signal) is None:
-            self._update_maps(neo_signal, lazy)
+        partial = not (t_start is None and t_stop is None and channels is None)
+        if partial or self._find_lazy_loaded(neo_signal) is None:
+            # partial reads do not represent the stored object and are
+            # neither registered as lazy loaded nor hashed
+            if not partial:
+                self._update_maps(neo_signal, lazy)
             nix_parent = self._get_parent(path)
             neo_parent = self._get_mapped_object(nix_parent)
             neo_signal.segment = neo_parent
         return neo_signal
 
-    def read_analogsignal(self, path, cascade=True, lazy=False):
-        return self.read_signal(path, lazy)
+    def read_analogsignal(self, path, cascade=True, lazy=False,
+                          t_start=None, t_stop=None, channels=None):
+        """
+        Reads the AnalogSignal at the location specified by the path.
+
+        If a time window (``t_start``, ``t_stop``) or a list of ``channels``
+        is given, only the matching samples are read from the file and the
+        returned signal starts at the first sample in the window.
+
+        :param path: Location of the signal in the file
+        :param cascade: Unused for signals
+        :param lazy: Do not load data if True
+        :param t_start: Start of the time window (Quantity scalar)
+        :param t_stop: End of the time window (Quantity scalar, exclusive)
+        :param channels: List of indices of the channels to read
+        :return: The AnalogSignal
+        """
+        return self.read_signal(path, lazy, t_start, t_stop, channels)
+
+    def read_irregularlysampledsignal(self, path, cascade=True, lazy=False,
+                                      t_start=None, t_stop=None,
+                                      channels=None):
+        """
+        Reads the IrregularlySampledSignal at the location specified by the
+        path.
+
+        If a time window (``t_start``, ``t_stop``) is given, the stored sample
+        times are searched for the window bounds and only the samples and
+        times within the window are read from the file.
+
+        :param path: Location of the signal in the file
+        :param cascade: Unused for signals
+        :param lazy: Do not load data if True
+        :param t_start: Start of the time window (Quantity scalar)
+        :param t_stop: End of the time window (Quantity scalar, exclusive)
+        :param channels: List of indices of the channels to read
+        :return: The IrregularlySampledSignal
+        """
+        return self.read_signal(path, lazy, t_start, t_stop, channels)
+
+    def read_eest(self, path, lazy=False, t_start=None, t_stop=None):
+        """
+        Reads the Epoch, Event, or SpikeTrain at the location specified by the
+        path.
 
-    def read_irregularlysampledsignal(self, path, cascade=True, lazy=False):
-        return self.read_signal(path, lazy)
+        If a time window (``t_start``, ``t_stop``) is given, the stored
+        positions are searched for the window bounds and only the times,
+        durations, labels, and waveforms within the window are read. This
+        requires the times to be stored in ascending order.
 
-    def read_eest(self, path, lazy=False):
+        :param path: Location of the object in the file
+        :param lazy: Do not load data if True
+        :param t_start: Start of the time window (Quantity scalar)
+        :param t_stop: End of the time window (Quantity scalar, exclusive)
+        :return: The Epoch, Event, or SpikeTrain
+        """
         nix_mtag = self._get_object_at(path)
-        neo_eest = self._mtag_eest_to_neo(nix_mtag, lazy)
+        neo_eest = self._mtag_eest_to_neo(nix_mtag, lazy, t_start, t_stop)
         neo_eest.path = path
-        self._update_maps(neo_eest, lazy)
+        if t_start is None and t_stop is None:
+            self._update_maps(neo_eest, lazy)
         nix_parent = self._get_parent(path)
         neo_parent = self._get_mapped_object(nix_parent)
         neo_eest.segment = neo_parent
         return neo_eest
 
-    def read_epoch(self, path, cascade=True, lazy=False):
-        return self.read_eest(path, lazy)
+    def read_epoch(self, path, cascade=True, lazy=False,
+                   t_start=None, t_stop=None):
+        return self.read_eest(path, lazy, t_start, t_stop)
 
-    def read_event(self, path, cascade=True, lazy=False):
-        return self.read_eest(path, lazy)
+    def read_event(self, path, cascade=True, lazy=False,
+                   t_start=None, t_stop=None):
+        return self.read_eest(path, lazy, t_start, t_stop)
 
-    def read_spiketrain(self, path, cascade=True, lazy=False):
-        return self.read_eest(path, lazy)
+    def read_spiketrain(self, path, cascade=True, lazy=False,
+                        t_start=None, t_stop=None):
+        return self.read_eest(path, lazy, t_start, t_stop)
 
     def read_unit(self, path, cascade=True, lazy=False):
         nix_source = self._get_object_at(path)
@@ -251,16 +392,31 @@ class NixIO(BaseIO):
 
     def _source_chx_to_neo(self, nix_source):
         neo_attrs = self._nix_attr_to_neo(nix_source)
-        chx = list(self._nix_attr_to_neo(c)
-                   for c in nix_source.sources
-                   if c.type == "neo.channelindex")
-        neo_attrs["channel_names"] = np.array([c["name"] for c in chx],
-                                              dtype="S")
-        neo_attrs["index"] = np.array([c["index"] for c in chx])
-        if "coordinates" in chx[0]:
-            coord_units = chx[0]["coordinates.units"]
-            coord_values = list(c["coordinates"] for c in chx)
-            neo_attrs["coordinates"] = pq.Quantity(coord_values, coord_units)
+        if "channels.index" in neo_attrs:
+            # compact layout
+            index = np.atleast_1d(neo_attrs.pop("channels.index"))
+            names = np.atleast_1d(neo_attrs.pop("channels.names"))
+            neo_attrs["channel_names"] = np.array(names, dtype="S")
+            neo_attrs["index"] = np.array(index)
+            if "channels.coordinates" in neo_attrs:
+                coord_units = neo_attrs.pop("channels.coordinates.units")
+                coord_values = np.reshape(
+                    neo_attrs.pop("channels.coordinates"), (len(index), -1)
+                )
+                neo_attrs["coordinates"] = pq.Quantity(coord_values,
+                                                       coord_units)
+        else:
+            chx = list(self._nix_attr_to_neo(c)
+                       for c in nix_source.sources
+                       if c.type == "neo.channelindex")
+            neo_attrs["channel_names"] = np.array([c["name"] for c in chx],
+                                                  dtype="S")
+            neo_attrs["index"] = np.array([c["index"] for c in chx])
+            if chx and "coordinates" in chx[0]:
+                coord_units = chx[0]["coordinates.units"]
+                coord_values = list(c["coordinates"] for c in chx)
+                neo_attrs["coordinates"] = pq.Quantity(coord_values,
+                                                       coord_units)
         rcg = ChannelIndex(**neo_attrs)
         self._object_map[nix_source.id] = rcg
         return rcg
@@ -271,35 +427,52 @@ class NixIO(BaseIO):
         self._object_map[nix_unit.id] = neo_unit
         return neo_unit
 
-    def _signal_da_to_neo(self, nix_da_group, lazy):
+    def _signal_da_to_neo(self, nix_da_group, lazy, t_start=None,
+                          t_stop=None, channels=None):
         """
         Convert a group of NIX DataArrays to a Neo signal. This method expects
         a list of data arrays that all represent the same, multidimensional
-        Neo Signal object.
+        Neo Signal object, or a list with a single 2-D DataArray that holds
+        all channels of the signal.
         This returns either an AnalogSignal or IrregularlySampledSignal.
 
+        If any of ``t_start``, ``t_stop``, or ``channels`` is given, only the
+        corresponding part of the data is read from the file and the returned
+        signal is not mapped to the NIX objects.
+
         :param nix_da_group: a list of NIX DataArray objects
+        :param lazy: Do not load data if True
+        :param t_start: Start of the time window to read (Quantity scalar)
+        :param t_stop: End of the time window to read (Quantity scalar)
+        :param channels: List of indices of the channels to read
         :return: a Neo Signal object
         """
-        nix_da_group = sorted(nix_da_group, key=lambda d: d.name)
+        # order channels by the integer index suffix of the DataArray names
+        nix_da_group = sorted(nix_da_group,
+                              key=lambda d: int(d.name.rsplit(".", 1)[1]))
         neo_attrs = self._nix_attr_to_neo(nix_da_group[0])
         metadata = nix_da_group[0].metadata
         neo_attrs["name"] = stringify(metadata.name)
         neo_type = nix_da_group[0].type
+        partial = not (t_start is None and t_stop is None and channels is None)
 
         unit = nix_da_group[0].unit
+        single = self._is_single_layout(nix_da_group)
+        nsamples = len(nix_da_group[0])
         if lazy:
             signaldata = pq.Quantity(np.empty(0), unit)
-            lazy_shape = (len(nix_da_group[0]), len(nix_da_group))
+            if single:
+                lazy_shape = tuple(nix_da_group[0].shape)
+            else:
+                lazy_shape = (nsamples, len(nix_da_group))
         else:
-            signaldata = pq.Quantity(np.transpose(nix_da_group), unit)
             lazy_shape = None
         timedim = self._get_time_dimension(nix_da_group[0])
         if (neo_type == "neo.analogsignal" or
                 isinstance(timedim, nixtypes["SampledDimension"])):
             if lazy:
                 sampling_period = pq.Quantity(1, timedim.unit)
-                t_start = pq.Quantity(0, timedim.unit)
+                sig_start = pq.Quantity(0, timedim.unit)
             else:
                 if "sampling_interval.units" in metadata.props:
                     sample_units = metadata["sampling_interval.units"]
@@ -311,55 +484,127 @@ class NixIO(BaseIO):
                     tsunits = metadata["t_start.units"]
                 else:
                     tsunits = timedim.unit
-                t_start = pq.Quantity(timedim.offset, tsunits)
+                sig_start = pq.Quantity(timedim.offset, tsunits)
+                first, last = 0, nsamples
+                if t_start is not None:
+                    first = self._sample_index(t_start, sig_start,
+                                               sampling_period, nsamples)
+                if t_stop is not None:
+                    last = self._sample_index(t_stop, sig_start,
+                                              sampling_period, nsamples)
+                signaldata = pq.Quantity(
+                    self._read_signal_data(nix_da_group, first, last,
+                                           channels),
+                    unit, copy=False
+                )
+                sig_start = sig_start + first * sampling_period
             neo_signal = AnalogSignal(
                 signal=signaldata, sampling_period=sampling_period,
-                t_start=t_start, **neo_attrs
+                t_start=sig_start, copy=False, **neo_attrs
             )
         elif neo_type == "neo.irregularlysampledsignal"\
                 or isinstance(timedim, nixtypes["RangeDimension"]):
             if lazy:
                 times = pq.Quantity(np.empty(0), timedim.unit)
             else:
-                times = pq.Quantity(timedim.ticks, timedim.unit)
+                ticks = self._dimension_dataset(timedim, "ticks")
+                first, last = self._window_indices(ticks, timedim.unit,
+                                                   t_start, t_stop)
+                times = pq.Quantity(ticks[first:last], timedim.unit)
+                signaldata = pq.Quantity(
+                    self._read_signal_data(nix_da_group, first, last,
+                                           channels),
+                    unit, copy=False
+                )
             neo_signal = IrregularlySampledSignal(
-                signal=signaldata, times=times, **neo_attrs
+                signal=signaldata, times=times, copy=False, **neo_attrs
             )
         else:
             return None
-        for da in nix_da_group:
-            self._object_map[da.id] = neo_signal
+        if not partial and self._map_objects:
+            for da in nix_da_group:
+                self._object_map[da.id] = neo_signal
         if lazy_shape:
             neo_signal.lazy_shape = lazy_shape
+        elif self.stats is not None:
+            nbytes = neo_signal.nbytes
+            if isinstance(neo_signal, IrregularlySampledSignal):
+                nbytes += neo_signal.times.nbytes
+            self._add_stats(bytes_read=nbytes)
         return neo_signal
 
-    def _mtag_eest_to_neo(self, nix_mtag, lazy):
+    def _read_signal_data(self, nix_da_group, first, last, channels=None):
+        """
+        Reads the samples ``first`` to ``last`` (exclusive) of a signal from
+        its DataArrays. Only the requested hyperslab is read from the file.
+
+        :param nix_da_group: sorted list of the DataArrays of the signal
+        :param first: Index of the first sample to read
+        :param last: Index after the last sample to read
+        :param channels: List of indices of the channels to read or None to
+         read all channels
+        :return: A (time x channel) numpy array
+        """
+        if self._is_single_layout(nix_da_group):
+            da = nix_da_group[0]
+            if self.mmap:
+                mapped = self._memmap_data(da)
+                if mapped is not None:
+                    da = mapped
+            if channels is None:
+                if last <= first:
+                    return np.empty((0, da.shape[1]), dtype=da.dtype)
+                return da[first:last]
+            channels = np.asarray(channels, dtype=int)
+            if last <= first:
+                return np.empty((0, len(channels)), dtype=da.dtype)
+            # read the smallest channel range that covers the selection
+            low, high = int(channels.min()), int(channels.max()) + 1
+            return da[first:last, low:high][:, channels - low]
+        if channels is not None:
+            nix_da_group = list(nix_da_group[c] for c in channels)
+        if last <= first:
+            return np.empty((0, len(nix_da_group)),
+                            dtype=nix_da_group[0].dtype)
+        return np.transpose(list(da[first:last] for da in nix_da_group))
+
+    def _mtag_eest_to_neo(self, nix_mtag, lazy, t_start=None, t_stop=None):
         neo_attrs = self._nix_attr_to_neo(nix_mtag)
         neo_type = nix_mtag.type
 
-        time_unit = nix_mtag.positions.unit
+        positions = nix_mtag.positions
+        time_unit = positions.unit
         if lazy:
             times = pq.Quantity(np.empty(0), time_unit)
-            lazy_shape = np.shape(nix_mtag.positions)
+            lazy_shape = np.shape(positions)
         else:
-            times = pq.Quantity(nix_mtag.positions, time_unit)
+            first, last = self._window_indices(positions, time_unit,
+                                               t_start, t_stop)
+            # empty DataArray slices can not be read
+            if first < last:
+                times = pq.Quantity(positions[first:last], time_unit)
+            else:
+                times = pq.Quantity(np.empty(0), time_unit)
             lazy_shape = None
         if neo_type == "neo.epoch":
             if lazy:
                 durations = pq.Quantity(np.empty(0), nix_mtag.extents.unit)
                 labels = np.empty(0, dtype='S')
             else:
-                durations = pq.Quantity(nix_mtag.extents, nix_mtag.extents.unit)
-                labels = np.array(nix_mtag.positions.dimensions[0].labels,
-                                  dtype="S")
+                if first < last:
+                    durations = pq.Quantity(nix_mtag.extents[first:last],
+                                            nix_mtag.extents.unit)
+                else:
+                    durations = pq.Quantity(np.empty(0),
+                                            nix_mtag.extents.unit)
+                labels = self._read_labels(positions, first, last)
             eest = Epoch(times=times, durations=durations, labels=labels,
                          **neo_attrs)
         elif neo_type == "neo.event":
             if lazy:
                 labels = np.empty(0, dtype='S')
             else:
-                labels = np.array(nix_mtag.positions.dimensions[0].labels,
-                                  dtype="S")
+                labels = self._read_labels(positions, first, last)
             eest = Event(times=times, labels=labels, **neo_attrs)
         elif neo_type == "neo.spiketrain":
             if "t_start" in neo_attrs:
@@ -368,20 +613,25 @@ class NixIO(BaseIO):
                     del neo_attrs["t_start.units"]
                 else:
                     t_start_units = time_unit
-                t_start = pq.Quantity(neo_attrs["t_start"], t_start_units)
+                st_start = pq.Quantity(neo_attrs["t_start"], t_start_units)
                 del neo_attrs["t_start"]
             else:
-                t_start = None
+                st_start = None
             if "t_stop" in neo_attrs:
                 if "t_stop.units" in neo_attrs:
                     t_stop_units = neo_attrs["t_stop.units"]
                     del neo_attrs["t_stop.units"]
                 else:
                     t_stop_units = time_unit
-                t_stop = pq.Quantity(neo_attrs["t_stop"], t_stop_units)
+                st_stop = pq.Quantity(neo_attrs["t_stop"], t_stop_units)
                 del neo_attrs["t_stop"]
             else:
-                t_stop = None
+                st_stop = None
+            # a windowed spiketrain only spans the window
+            if t_start is not None and (st_start is None or t_start > st_start):
+                st_start = t_start
+            if t_stop is not None and (st_stop is None or t_stop < st_stop):
+                st_stop = t_stop
             if "sampling_interval.units" in neo_attrs:
                 interval_units = neo_attrs["sampling_interval.units"]
                 del neo_attrs["sampling_interval.units"]
@@ -392,8 +642,8 @@ class NixIO(BaseIO):
                 del neo_attrs["left_sweep.units"]
             else:
                 left_sweep_units = None
-            eest = SpikeTrain(times=times, t_start=t_start,
-                              t_stop=t_stop, **neo_attrs)
+            eest = SpikeTrain(times=times, t_start=st_start,
+                              t_stop=st_stop, **neo_attrs)
             if len(nix_mtag.features):
                 wfda = nix_mtag.features[0].data
                 wftime = self._get_time_dimension(wfda)
@@ -402,7 +652,17 @@ class NixIO(BaseIO):
                     eest.sampling_period = pq.Quantity(1, wftime.unit)
                     eest.left_sweep = pq.Quantity(0, wftime.unit)
                 else:
-                    eest.waveforms = pq.Quantity(wfda, wfda.unit)
+                    if t_start is None and t_stop is None:
+                        wfdata = wfda[:]
+                    else:
+                        # DataArray slices are not clipped to the extent
+                        # and empty ones can not be read
+                        wflast = min(last, wfda.data_extent[0])
+                        if first < wflast:
+                            wfdata = wfda[first:wflast]
+                        else:
+                            wfdata = np.empty((0,) + wfda.data_extent[1:])
+                    eest.waveforms = pq.Quantity(wfdata, wfda.unit)
                     if interval_units is None:
                         interval_units = wftime.unit
                     eest.sampling_period = pq.Quantity(
@@ -416,11 +676,58 @@ class NixIO(BaseIO):
                         )
         else:
             return None
-        self._object_map[nix_mtag.id] = eest
+        if t_start is None and t_stop is None and self._map_objects:
+            self._object_map[nix_mtag.id] = eest
         if lazy_shape:
             eest.lazy_shape = lazy_shape
+        elif self.stats is not None:
+            nbytes = eest.times.nbytes
+            if isinstance(eest, Epoch):
+                nbytes += eest.durations.nbytes
+            if isinstance(eest, SpikeTrain) and eest.waveforms is not None:
+                nbytes += eest.waveforms.nbytes
+            self._add_stats(bytes_read=nbytes)
         return eest
 
+    def _window_indices(self, dataset, unit, t_start=None, t_stop=None):
+        """
+        Returns the index range of the values of a sorted 1-D dataset of times
+        that fall within the time window [t_start, t_stop). A missing bound
+        extends the window to the respective end of the dataset.
+
+        :param dataset: Sorted dataset of times (DataArray, HDF5 dataset, or
+         array)
+        :param unit: Units of the values in the dataset
+        :param t_start: Start of the window (Quantity scalar) or None
+        :param t_stop: End of the window (Quantity scalar) or None
+        :return: Tuple of the first index and the index after the last one
+        """
+        first, last = 0, len(dataset)
+        if t_start is not None:
+            first = self._search_sorted(
+                dataset, t_start.rescale(unit).magnitude.item()
+            )
+        if t_stop is not None:
+            last = self._search_sorted(
+                dataset, t_stop.rescale(unit).magnitude.item()
+            )
+        return first, max(first, last)
+
+    def _read_labels(self, positions, first, last):
+        """
+        Reads the labels ``first`` to ``last`` (exclusive) stored in the
+        SetDimension of a MultiTag positions DataArray.
+
+        :param positions: The positions DataArray
+        :param first: Index of the first label to read
+        :param last: Index after the last label to read
+        :return: Array of labels
+        """
+        if last <= first:
+            return np.empty(0, dtype="S")
+        labels = self._dimension_dataset(positions.dimensions[0], "labels")
+        return np.array(labels[first:last], dtype="S")
+
     def _read_cascade(self, nix_obj, path, cascade, lazy):
         neo_obj = self._object_map[nix_obj.id]
         for neocontainer in getattr(neo_obj, "_child_containers", []):
@@ -449,7 +756,7 @@ class NixIO(BaseIO):
             # set references to signals
             parent_block_path = "/" + path.split("/")[1]
             parent_block = self._get_object_at(parent_block_path)
-            ref_das = self._get_referers(nix_obj, parent_block.data_arrays)
+            ref_das = self._get_referers(nix_obj, parent_block, "data_arrays")
             ref_signals = self._get_mapped_objects(ref_das)
             # deduplicate by name
             ref_signals = list(dict((s.name, s) for s in ref_signals).values())
@@ -464,7 +771,7 @@ class NixIO(BaseIO):
             # set references to spiketrains
             parent_block_path = "/" + path.split("/")[1]
             parent_block = self._get_object_at(parent_block_path)
-            ref_mtags = self._get_referers(nix_obj, parent_block.multi_tags)
+            ref_mtags = self._get_referers(nix_obj, parent_block, "multi_tags")
             ref_sts = self._get_mapped_objects(ref_mtags)
             for st in ref_sts:
                 neo_obj.spiketrains.append(st)
@@ -481,8 +788,27 @@ class NixIO(BaseIO):
         read_func = getattr(self, "read_" + neotype)
         return read_func(path, cascade, lazy)
 
-    def load_lazy_object(self, obj):
-        return self.get(obj.path, cascade=False, lazy=False)
+    def load_lazy_object(self, obj, register=True):
+        """
+        Loads the data of a lazily read data object.
+
+        Loaded objects are registered with the IO like the objects it reads
+        (mapped to their NIX objects and hashed for partial writes). With
+        ``register`` False they are not, so the IO keeps no reference to them
+        and they are freed once the caller releases them, e.g., when a file is
+        converted one object at a time.
+
+        :param obj: Lazily read Neo data object
+        :param register: Register the loaded object with the IO
+        :return: The loaded object
+        """
+        if register:
+            return self.get(obj.path, cascade=False, lazy=False)
+        self._map_objects = False
+        try:
+            return self.get(obj.path, cascade=False, lazy=False)
+        finally:
+            self._map_objects = True
 
     def load_lazy_cascade(self, path, lazy):
         """
@@ -496,17 +822,107 @@ class NixIO(BaseIO):
         neoobj = self.get(path, cascade=True, lazy=lazy)
         return neoobj
 
-    def write_all_blocks(self, neo_blocks):
+    def write_all_blocks(self, neo_blocks, jobs=None, loader=None,
+                         **storage_options):
         """
         Convert all ``neo_blocks`` to the NIX equivalent and write them to the
         file.
 
+        With ``jobs`` greater than 1, the objects of each block are converted
+        (hashes, attributes, and data arrays) in a pool of threads while the
+        previous block is being written. At most ``2 * jobs`` converted objects
+        are held at a time. All writes to the file are still made by the
+        calling thread.
+
         :param neo_blocks: List (or iterable) containing Neo blocks
+        :param jobs: Number of threads converting objects for writing
+        :param loader: Function loading the lazy objects of the blocks (see
+         ``write_block``)
+        :param storage_options: Storage options overriding the ones of the IO
+         for this write (see ``write_block``)
         :return: A list containing the new NIX Blocks
         """
+        neo_blocks = list(neo_blocks)
         self.resolve_name_conflicts(neo_blocks)
-        for bl in neo_blocks:
-            self.write_block(bl)
+        if not jobs or jobs < 2:
+            for bl in neo_blocks:
+                self.write_block(bl, loader=loader, **storage_options)
+            return
+        pool = ThreadPool(jobs)
+        self._prepare_pool = pool
+        self._prepare_limit = 2 * jobs
+        try:
+            if neo_blocks:
+                self._prepare_block(neo_blocks[0])
+            for idx, bl in enumerate(neo_blocks):
+                if idx + 1 < len(neo_blocks):
+                    self._prepare_block(neo_blocks[idx + 1])
+                self.write_block(bl, loader=loader, **storage_options)
+        finally:
+            self._prepared.clear()
+            self._prepare_queue.clear()
+            self._prepare_pool = None
+            pool.terminate()
+            pool.join()
+
+    def _prepare_block(self, block):
+        """
+        Queues all objects of a Neo Block, in the order they are written, for
+        conversion by ``_prepare_object`` in the thread pool of
+        ``write_all_blocks``. The results are used by ``_write_object`` when
+        the objects are written.
+
+        Name conflicts are resolved before queueing, since object names are
+        part of the hash. Lazy objects are not queued; they are converted
+        when they are loaded for writing.
+
+        :param block: Neo Block
+        """
+        objects = [block]
+        while objects:
+            obj = objects.pop()
+            self.resolve_name_conflicts(obj)
+            if not hasattr(obj, "lazy_shape"):
+                self._prepare_queue.append(obj)
+            if isinstance(obj, ChannelIndex):
+                containers = ["units"]
+            elif isinstance(obj, Unit):
+                containers = []
+            else:
+                containers = getattr(obj, "_child_containers", [])
+            for container in reversed(containers):
+                objects.extend(reversed(getattr(obj, container)))
+        self._submit_prepared()
+
+    def _submit_prepared(self):
+        """
+        Submits queued objects to the thread pool until ``_prepare_limit``
+        converted objects are pending. Each result keeps a copy of the object
+        data until it is written, so this bounds the memory they take.
+        """
+        while (self._prepare_queue and
+               len(self._prepared) < self._prepare_limit):
+            obj = self._prepare_queue.popleft()
+            self._prepared[id(obj)] = self._prepare_pool.apply_async(
+                self._prepare_object, (obj,)
+            )
+
+    def _prepare_object(self, obj):
+        """
+        Computes the hash and the NIX attributes of a Neo object for
+        ``_write_object``. Signal data is copied into the row layout of split
+        signals here, so the writing thread only needs to store it.
+
+        :param obj: Neo object
+        :return: Tuple of the object hash and attribute dictionary
+        """
+        attr = self._neo_attr_to_nix(obj)
+        if isinstance(obj, pq.Quantity):
+            attr.update(self._neo_data_to_nix(obj))
+            if (self.signal_layout == "split" and
+                    isinstance(obj, (AnalogSignal, IrregularlySampledSignal))):
+                attr["data"] = np.ascontiguousarray(attr["data"])
+        return self._compute_hash(obj), attr
 
     def _write_object(self, obj, loc=""):
         if isinstance(obj, Block):
@@ -521,29 +937,109 @@ class NixIO(BaseIO):
         objpath = loc + containerstr + obj.name
         oldhash = self._object_hashes.get(objpath)
         if oldhash is None:
-            try:
-                oldobj = self.get(objpath, cascade=False, lazy=False)
-                oldhash = self._hash_object(oldobj)
-            except (KeyError, IndexError):
-                oldhash = None
-        newhash = self._hash_object(obj)
+            oldhash = self._load_object_hash(objpath)
+        dataobj = obj
+        if self._loader is not None and hasattr(obj, "lazy_shape"):
+            dataobj = self._loader(obj)
+            dataobj.name = obj.name
+        prepared = self._prepared.pop(id(obj), None)
+        if prepared is not None:
+            self._submit_prepared()
+            newhash, attr = prepared.get()
+        else:
+            newhash, attr = self._compute_hash(dataobj), None
         if oldhash != newhash:
-            attr = self._neo_attr_to_nix(obj)
-            if isinstance(obj, pq.Quantity):
-                attr.update(self._neo_data_to_nix(obj))
+            if attr is None:
+                attr = self._neo_attr_to_nix(dataobj)
+                if isinstance(dataobj, pq.Quantity):
+                    attr.update(self._neo_data_to_nix(dataobj))
             if oldhash is None:
                 nixobj = self._create_nix_obj(loc, attr)
+                self._path_map[objpath] = nixobj
             else:
                 nixobj = self._get_object_at(objpath)
             self._write_attr_annotations(nixobj, attr, objpath)
             if isinstance(obj, pq.Quantity):
                 self._write_data(nixobj, attr, objpath)
+            self._set_stored_hash(nixobj, newhash)
         else:
             nixobj = self._get_object_at(objpath)
         self._object_map[id(obj)] = nixobj
         self._object_hashes[objpath] = newhash
         self._write_cascade(obj, objpath)
 
+    def _load_object_hash(self, path):
+        """
+        Returns the hash of the object stored at the location defined by the
+        path, or None if there is no object there.
+
+        The digest stored with the object when it was written is used when
+        available, so unchanged objects are not read back from the file.
+        Objects written without a digest, or with one of a different hash
+        backend, are read and hashed, and the digest is stored for subsequent
+        writes.
+
+        :param path: Path string
+        :return: Hash digest or None
+        """
+        try:
+            nixobj = self._get_object_at(path)
+        except KeyError:
+            return None
+        if isinstance(nixobj, list) and not len(nixobj):
+            return None
+        digest = self._get_stored_hash(nixobj)
+        if digest is None:
+            try:
+                oldobj = self.get(path, cascade=False, lazy=False)
+            except (KeyError, IndexError):
+                return None
+            digest = self._compute_hash(oldobj)
+            self._set_stored_hash(nixobj, digest)
+        return digest
+
+    def _get_stored_hash(self, nixobj):
+        """
+        Returns the object hash stored on a NIX object by ``_set_stored_hash``
+        or None if the object has no stored hash. For signals, the hash is
+        kept on the first DataArray of the list.
+        Hashes stored without a hash backend (older files) or computed with
+        a different one than the IO uses are unknown and also return None.
+
+        :param nixobj: NIX object or list of DataArrays
+        :return: Hash digest or None
+        """
+        if isinstance(nixobj, list):
+            nixobj = nixobj[0]
+        h5group = getattr(nixobj, "_h5group", None)
+        if h5group is None:
+            return None
+        stored = stringify(h5group.get_attr("neo_hash"))
+        if stored is None or ":" not in stored:
+            return None
+        backend, digest = stored.split(":", 1)
+        if backend != self.hash_backend:
+            return None
+        return digest
+
+    def _set_stored_hash(self, nixobj, digest):
+        """
+        Stores an object hash, prefixed by the name of the hash backend, as an
+        HDF5 attribute of a NIX object. The attribute is not part of the NIX
+        data model and is ignored when reading objects. A digest of None
+        removes the stored hash.
+
+        :param nixobj: NIX object or list of DataArrays
+        :param digest: Hash digest computed with the backend of the IO or None
+        """
+        if isinstance(nixobj, list):
+            nixobj = nixobj[0]
+        h5group = getattr(nixobj, "_h5group", None)
+        if h5group is not None:
+            if digest is not None:
+                digest = "{}:{}".format(self.hash_backend, digest)
+            h5group.set_attr("neo_hash", digest)
+
     def _create_nix_obj(self, loc, attr):
         parentobj = self._get_object_at(loc)
         if attr["type"] == "block":
@@ -560,18 +1056,25 @@ class NixIO(BaseIO):
             typestr = "neo." + attr["type"]
             parentmd = self._get_or_init_metadata(parentobj, loc)
             sigmd = parentmd.create_section(attr["name"], typestr+".metadata")
-            for idx, datarow in enumerate(attr["data"]):
+            if self.signal_layout == "single":
+                # one (time x channel) DataArray, keeping the ".0" suffix so
+                # that path resolution and grouping match the split layout
+                datarows = [np.transpose(attr["data"])]
+            else:
+                datarows = attr["data"]
+            for idx, datarow in enumerate(datarows):
                 name = "{}.{}".format(attr["name"], idx)
-                da = parentblock.create_data_array(name, typestr, data=datarow)
+                da = self._create_data_array(parentblock, name, typestr,
+                                             datarow)
                 da.metadata = sigmd
                 nixobj.append(da)
             parentobj.data_arrays.extend(nixobj)
         elif attr["type"] in ("epoch", "event", "spiketrain"):
             blockpath = "/" + loc.split("/")[1]
             parentblock = self._get_object_at(blockpath)
-            timesda = parentblock.create_data_array(
-                attr["name"]+".times", "neo."+attr["type"]+".times",
-                data=attr["data"]
+            timesda = self._create_data_array(
+                parentblock, attr["name"]+".times",
+                "neo."+attr["type"]+".times", attr["data"]
             )
             nixobj = parentblock.create_multi_tag(
                 attr["name"], "neo."+attr["type"], timesda
@@ -583,15 +1086,35 @@ class NixIO(BaseIO):
             raise ValueError("Unable to create NIX object. Invalid type.")
         return nixobj
 
-    def write_block(self, bl, loc=""):
+    def write_block(self, bl, loc="", loader=None, **storage_options):
         """
         Convert ``bl`` to the NIX equivalent and write it to the file.
 
+        A block read lazily can be written with a ``loader``: each lazy
+        object of the block is then loaded right before it is written and
+        released afterwards, so only one object's data is held in memory at a
+        time.
+
         :param bl: Neo block to be written
         :param loc: Unused for blocks
+        :param loader: Function returning the loaded version of a lazy object
+         of ``bl`` (e.g., the ``load_lazy_object`` method of the IO that read
+         the block)
+        :param storage_options: Storage options (``compression``,
+         ``compression_opts``, ``shuffle``, ``chunks``) overriding the ones of
+         the IO for this write
         """
-        self._write_object(bl, loc)
-        self._create_references(bl)
+        iooptions = self._storage_options
+        self._storage_options = self._check_storage_options(
+            dict(iooptions, **storage_options)
+        )
+        self._loader = loader
+        try:
+            self._write_object(bl, loc)
+            self._create_references(bl)
+        finally:
+            self._storage_options = iooptions
+            self._loader = None
 
     def write_channelindex(self, chx, loc=""):
         """
@@ -613,16 +1136,94 @@ class NixIO(BaseIO):
         """
         self._write_object(seg, loc)
 
+    def append_segment(self, seg, block, **storage_options):
+        """
+        Convert ``seg`` to a NIX Group and write it as a new Segment of the
+        Block named ``block``, which is created if it does not exist in the
+        file. Recordings read one Segment at a time can be written this way
+        without holding all of their Segments in memory.
+
+        Names of the Segment and its data objects that are already used in
+        the Block are made unique as in ``resolve_name_conflicts``. Only the
+        references among the objects of the Segment are created.
+
+        :param seg: Neo Segment to be written
+        :param block: Name of the Block
+        :param storage_options: Storage options overriding the ones of the IO
+         for this write (see ``write_block``)
+        :return: Path to the new Segment
+        """
+        blockpath = "/" + block
+        try:
+            nixblock = self._get_object_at(blockpath)
+        except KeyError:
+            self._write_object(Block(name=block))
+            nixblock = self._get_object_at(blockpath)
+        self.resolve_name_conflicts(seg)
+        seg.name = self._unused_name(seg.name,
+                                     lambda n: n in nixblock.groups)
+        assigned = set()
+
+        def taken(name):
+            return (name in assigned or name in nixblock.multi_tags or
+                    name + ".0" in nixblock.data_arrays or
+                    name + ".times" in nixblock.data_arrays)
+
+        for obj in (seg.analogsignals + seg.irregularlysampledsignals +
+                    seg.epochs + seg.events + seg.spiketrains):
+            obj.name = self._unused_name(obj.name, taken)
+            assigned.add(obj.name)
+        shell = Block(name=block)
+        shell.segments.append(seg)
+        iooptions = self._storage_options
+        self._storage_options = self._check_storage_options(
+            dict(iooptions, **storage_options)
+        )
+        try:
+            self._write_object(seg, blockpath)
+            self._create_references(shell)
+        finally:
+            self._storage_options = iooptions
+        # the stored Block outgrows the hash of the (empty) written one
+        self._object_hashes.pop(blockpath, None)
+        self._set_stored_hash(nixblock, None)
+        return blockpath + "/segments/" + seg.name
+
+    @staticmethod
+    def _unused_name(name, taken):
+        """
+        Returns ``name``, or ``name`` with the first numeric suffix (as added
+        by ``resolve_name_conflicts``) for which ``taken`` returns False.
+
+        :param name: Name of the object
+        :param taken: Function returning True for names in use
+        :return: The unused name
+        """
+        newname, suffix = name, 0
+        while taken(newname):
+            suffix += 1
+            newname = "{}-{}".format(name, suffix)
+        return newname
+
     def write_indices(self, chx, loc=""):
         """
         Create NIX Source objects to represent individual indices based on the
         provided ``chx`` (ChannelIndex) write them to the NIX file at
         the parent ChannelIndex object.
+        With the 'compact' channel layout, the channels are stored as array
+        properties of the ChannelIndex metadata instead
+        (see ``_write_compact_indices``).
 
         :param chx: The Neo ChannelIndex
         :param loc: Path to the CHX
         """
         nixsource = self._get_mapped_object(chx)
+        if self.channel_layout == "compact":
+            self._write_compact_indices(chx, nixsource, loc)
+            return
+        if nixsource.metadata is not None:
+            self._remove_properties(nixsource.metadata,
+                                    self._compact_channel_props)
         for idx, channel in enumerate(chx.index):
             if len(chx.channel_names):
                 channame = stringify(chx.channel_names[idx])
@@ -636,7 +1237,7 @@ class NixIO(BaseIO):
             nixchan.definition = nixsource.definition
             chanpath = loc + "/channelindex/" + channame
             chanmd = self._get_or_init_metadata(nixchan, chanpath)
-            chanmd["index"] = self._to_value(int(channel))
+            self._write_property(chanmd, "index", int(channel))
             if chx.coordinates is not None:
                 coords = chx.coordinates[idx]
                 coordunits = stringify(coords[0].dimensionality)
@@ -650,12 +1251,65 @@ class NixIO(BaseIO):
                 chanmd.create_property("coordinates", nixcoords)
                 chanmd["coordinates.units"] = nixcoordunits
 
+    def _write_compact_indices(self, chx, nixsource, loc):
+        """
+        Stores the channels of the provided ``chx`` (ChannelIndex) as array
+        properties of the metadata of its NIX Source: 'channels.index',
+        'channels.names', and, if the ChannelIndex has coordinates,
+        'channels.coordinates' (flattened, channel-major) with
+        'channels.coordinates.units'. Channel Sources of a previous write in
+        the 'sources' layout are removed.
+
+        :param chx: The Neo ChannelIndex
+        :param nixsource: The NIX Source of the ChannelIndex
+        :param loc: Path to the CHX
+        """
+        chxmd = self._get_or_init_metadata(nixsource, loc)
+        for nixchan in list(nixsource.sources):
+            if nixchan.type != "neo.channelindex":
+                continue
+            chanmd = nixchan.metadata
+            del nixsource.sources[nixchan]
+            if chanmd is not None and chanmd in chxmd.sections:
+                self._section_cache.pop(chanmd.id, None)
+                del chxmd.sections[chanmd]
+        self._remove_properties(chxmd, self._compact_channel_props)
+        if not len(chx.index):
+            return
+        if len(chx.channel_names):
+            channames = list(stringify(n) for n in chx.channel_names)
+        else:
+            channames = list("{}.ChannelIndex{}".format(chx.name, idx)
+                             for idx in range(len(chx.index)))
+        self._write_property(chxmd, "channels.index", np.asarray(chx.index))
+        self._write_property(chxmd, "channels.names", channames)
+        if chx.coordinates is not None:
+            coords = chx.coordinates
+            self._write_property(chxmd, "channels.coordinates",
+                                 np.ravel(coords.magnitude))
+            self._write_property(chxmd, "channels.coordinates.units",
+                                 stringify(coords.dimensionality))
+
+    def _remove_properties(self, section, names):
+        """
+        Deletes the properties with the given names from a metadata Section
+        if it has them.
+
+        :param section: The metadata Section
+        :param names: Names of the properties
+        """
+        for name in names:
+            if name in section.props:
+                self._section_cache.pop(section.id, None)
+                del section[name]
+
     def write_analogsignal(self, anasig, loc=""):
         """
         Convert the provided ``anasig`` (AnalogSignal) to a list of NIX
         DataArray objects and write them to the NIX file at the location defined
         by ``loc``. All DataArray objects created from the same
         AnalogSignal have their metadata section point to the same object.
+        With the 'single' signal layout, the list holds one 2-D DataArray.
 
         :param anasig: The Neo AnalogSignal to be written
         :param loc: Path to the parent of the new AnalogSignal
@@ -668,7 +1322,8 @@ class NixIO(BaseIO):
         NIX DataArray objects and write them to the NIX file at the location
         defined by ``loc``. All DataArray objects created from the same
         IrregularlySampledSignal have their metadata section point to the same
-        object.
+        object. With the 'single' signal layout, the list holds one 2-D
+        DataArray.
 
         :param irsig: The Neo IrregularlySampledSignal to be written
         :param loc: Path to the parent of the new
@@ -716,6 +1371,108 @@ class NixIO(BaseIO):
         """
         self._write_object(ut, loc)
 
+    def open_signal_stream(self, block, segment, name, channels,
+                           sampling_rate, units=pq.dimensionless,
+                           t_start=0 * pq.s, dtype="f8"):
+        """
+        Create an empty AnalogSignal in the NIX file and return a stream that
+        appends chunks of samples to it as they are recorded, so the full
+        signal never needs to be held in memory. The signal is stored using
+        the signal layout and storage options of the IO.
+        The Block and Segment are created if they do not exist in the file.
+
+        :param block: Name of the Block
+        :param segment: Name of the Segment in the Block
+        :param name: Name of the new AnalogSignal
+        :param channels: Number of channels of the signal
+        :param sampling_rate: Sampling rate of the signal (Quantity scalar)
+        :param units: Units of the signal samples
+        :param t_start: Time of the first sample (Quantity scalar)
+        :param dtype: Data type of the stored samples
+        :return: A NixSignalStream
+        """
+        signal = AnalogSignal(signal=np.empty((0, channels), dtype=dtype),
+                              units=units, sampling_rate=sampling_rate,
+                              t_start=t_start, name=name)
+        path = self._create_stream_object(signal, block, segment)
+        return NixSignalStream(self, path, self._get_object_at(path),
+                               signal.units)
+
+    def open_spiketrain_stream(self, block, segment, name, t_stop,
+                               t_start=0 * pq.s, units=pq.s):
+        """
+        Create an empty SpikeTrain in the NIX file and return a stream that
+        appends spike times to it. If appended spike times exceed ``t_stop``,
+        the stored t_stop is extended when the stream is closed.
+        The Block and Segment are created if they do not exist in the file.
+
+        :param block: Name of the Block
+        :param segment: Name of the Segment in the Block
+        :param name: Name of the new SpikeTrain
+        :param t_stop: End time of the SpikeTrain (Quantity scalar)
+        :param t_start: Start time of the SpikeTrain (Quantity scalar)
+        :param units: Units of the spike times
+        :return: A NixMultiTagStream
+        """
+        spiketrain = SpikeTrain(times=pq.Quantity(np.empty(0), units),
+                                t_start=t_start, t_stop=t_stop, name=name)
+        path = self._create_stream_object(spiketrain, block, segment)
+        return NixMultiTagStream(self, path, self._get_object_at(path),
+                                 spiketrain.units, t_stop=spiketrain.t_stop)
+
+    def open_event_stream(self, block, segment, name, units=pq.s):
+        """
+        Create an empty Event in the NIX file and return a stream that appends
+        event times and labels to it.
+        The Block and Segment are created if they do not exist in the file.
+
+        :param block: Name of the Block
+        :param segment: Name of the Segment in the Block
+        :param name: Name of the new Event
+        :param units: Units of the event times
+        :return: A NixMultiTagStream
+        """
+        event = Event(times=pq.Quantity(np.empty(0), units),
+                      labels=np.array([], dtype="S"), name=name)
+        path = self._create_stream_object(event, block, segment)
+        return NixMultiTagStream(self, path, self._get_object_at(path),
+                                 event.units)
+
+    def _create_stream_object(self, obj, block, segment):
+        """
+        Writes the empty Neo object ``obj`` to the Segment ``segment`` of the
+        Block ``block``, creating the Block and Segment if necessary.
+
+        :param obj: Empty Neo data object
+        :param block: Name of the Block
+        :param segment: Name of the Segment
+        :return: Path to the new object
+        """
+        blockpath = "/" + block
+        try:
+            self._get_object_at(blockpath)
+        except KeyError:
+            self._write_object(Block(name=block))
+        segpath = blockpath + "/segments/" + segment
+        try:
+            self._get_object_at(segpath)
+        except KeyError:
+            self._write_object(Segment(name=segment), blockpath)
+        path = segpath + "/" + type(obj).__name__.lower() + "s/" + obj.name
+        try:
+            existing = self._get_object_at(path)
+        except KeyError:
+            existing = None
+        if isinstance(existing, list) and not len(existing):
+            existing = None
+        if existing is not None:
+            raise ValueError("Object {} already exists.".format(path))
+        self._write_object(obj, segpath)
+        # the stored object outgrows the (empty) hashed one
+        self._object_hashes.pop(path, None)
+        self._set_stored_hash(self._get_object_at(path), None)
+        return path
+
     def _write_cascade(self, neoobj, path=""):
         if isinstance(neoobj, ChannelIndex):
             containers = ["units"]
@@ -747,13 +1504,16 @@ class NixIO(BaseIO):
         :param block: A Neo Block that has already been converted and mapped to
          NIX objects.
         """
+        # new sources invalidate the reverse reference index
+        self._referer_index.clear()
         for seg in block.segments:
             group = self._get_mapped_object(seg)
             group_signals = self._get_contained_signals(group)
             for mtag in group.multi_tags:
                 if mtag.type in ("neo.epoch", "neo.event"):
-                    mtag.references.extend([sig for sig in group_signals
-                                            if sig not in mtag.references])
+                    self._add_links(mtag.references, group_signals)
+        # links to add to the sources of each DataArray and MultiTag
+        newsources = OrderedDict()
         for rcg in block.channel_indexes:
             rcgsource = self._get_mapped_object(rcg)
             das = self._get_mapped_objects(rcg.analogsignals +
@@ -761,16 +1521,172 @@ class NixIO(BaseIO):
             # flatten nested lists
             das = [da for dalist in das for da in dalist]
             for da in das:
-                if rcgsource not in da.sources:
-                    da.sources.append(rcgsource)
+                newsources.setdefault(da.id, (da, list()))[1].append(
+                    rcgsource
+                )
             for unit in rcg.units:
                 unitsource = self._get_mapped_object(unit)
                 for st in unit.spiketrains:
-                    stmtag = self._get_mapped_object(st)
-                    if rcgsource not in stmtag.sources:
-                        stmtag.sources.append(rcgsource)
-                    if unitsource not in stmtag.sources:
-                        stmtag.sources.append(unitsource)
+                    mtag = self._get_mapped_object(st)
+                    newsources.setdefault(mtag.id, (mtag, list()))[1].extend(
+                        (rcgsource, unitsource)
+                    )
+        for nixobj, sources in newsources.values():
+            self._add_links(nixobj.sources, sources)
+
+    @staticmethod
+    def _add_links(links, targets):
+        """
+        Appends the NIX objects in ``targets`` to the link list ``links``
+        (e.g., the references of a MultiTag or the sources of a DataArray),
+        skipping objects that are already linked and duplicates.
+        The ids of the existing links are read once, so adding the links is
+        linear in the number of existing and new links.
+
+        :param links: The references or sources of a NIX object
+        :param targets: List of NIX objects to link
+        """
+        linked = set(link.id for link in links)
+        newlinks = list()
+        for target in targets:
+            if target.id not in linked:
+                linked.add(target.id)
+                newlinks.append(target)
+        if newlinks:
+            links.extend(newlinks)
+
+    def _create_data_array(self, parentblock, name, typestr, data):
+        """
+        Creates a DataArray in ``parentblock`` that holds ``data``. The HDF5
+        dataset is created with the storage options of the current write.
+        Empty DataArrays are created to be extended later (e.g., by streams),
+        so they are always resizable and chunked for their future size.
+
+        :param parentblock: The NIX Block in which the DataArray is created
+        :param name: Name of the new DataArray
+        :param typestr: Type of the new DataArray
+        :param data: The data to store
+        :return: The new DataArray
+        """
+        data = np.ascontiguousarray(data)
+        start = time.time()
+        da = self._create_filtered_data_array(parentblock, name, typestr, data)
+        self._add_stats(datasets_created=1, bytes_written=data.nbytes,
+                        dataset_creation_time=time.time() - start)
+        return da
+
+    def _create_filtered_data_array(self, parentblock, name, typestr, data):
+        """
+        Creates the DataArray for ``_create_data_array`` from a contiguous
+        array.
+        """
+        options = self._storage_options
+        growing = not data.size
+        if (options["compression"] is None and options["chunks"] is None and
+                not options["shuffle"] and not growing):
+            return parentblock.create_data_array(name, typestr, data=data)
+        if options["chunks"] is False and not growing:
+            dsetargs = dict()
+        else:
+            dsetargs = dict(
+                maxshape=(None,) * data.ndim,
+                chunks=self._chunk_shape(data.shape, data.dtype, growing),
+                compression=options["compression"],
+                compression_opts=options["compression_opts"],
+                shuffle=options["shuffle"]
+            )
+        da = parentblock.create_data_array(name, typestr, dtype=data.dtype,
+                                           shape=(0,) * data.ndim)
+        replaced = self._replace_data_dataset(da, data=data, **dsetargs)
+        if not replaced and not growing:
+            # unfiltered dataset created by NIX
+            da.data_extent = data.shape
+            da.write_direct(data)
+        return da
+
+    @staticmethod
+    def _replace_data_dataset(da, **dsetargs):
+        """
+        Replaces the (empty) data dataset created by NIX for a new DataArray
+        with an HDF5 dataset created with the given h5py ``create_dataset``
+        arguments, e.g., filters and chunking. The HDF5 group of the
+        DataArray is not part of the public nixpy API. If the nixpy backend
+        does not provide it, the DataArray is left unchanged and False is
+        returned.
+
+        :param da: The new DataArray
+        :param dsetargs: Arguments of ``h5py.Group.create_dataset``
+        :return: True if the dataset was replaced
+        """
+        h5group = getattr(getattr(da, "_h5group", None), "group", None)
+        if h5group is None or "data" not in h5group:
+            return False
+        del h5group["data"]
+        h5group.create_dataset("data", **dsetargs)
+        return True
+
+    def _chunk_shape(self, shape, dtype, growing=False):
+        """
+        Returns the chunk shape of a dataset with the given shape and dtype.
+        A configured chunk shape tuple is used for datasets of the same rank.
+        Otherwise, chunks are time-major: they span all axes but the first,
+        which is cut into blocks of the configured length, or of about
+        ``_chunk_bytes`` if no length was configured.
+
+        :param shape: Shape of the dataset
+        :param dtype: Data type of the dataset
+        :param growing: The dataset will be extended along the first axis, so
+         chunks are not limited to its current length
+        :return: The chunk shape tuple
+        """
+        chunks = self._storage_options["chunks"]
+        if isinstance(chunks, tuple):
+            if len(chunks) == len(shape):
+                return chunks
+            chunks = None
+        rowshape = tuple(max(d, 1) for d in shape[1:])
+        if isinstance(chunks, int) and not isinstance(chunks, bool):
+            nrows = chunks
+        else:
+            rowbytes = np.dtype(dtype).itemsize * int(np.prod(rowshape))
+            nrows = self._chunk_bytes // max(rowbytes, 1)
+            if not growing:
+                nrows = min(nrows, shape[0])
+        return (max(nrows, 1),) + rowshape
+
+    @classmethod
+    def _check_storage_options(cls, options):
+        """
+        Validates a dictionary of dataset storage options.
+
+        :param options: Dictionary of storage options
+        :return: The validated options
+        """
+        for name in options:
+            if name not in cls._storage_option_names:
+                raise ValueError("Invalid storage option '{}'. "
+                                 "Valid options: {}.".format(
+                                     name, ", ".join(cls._storage_option_names)
+                                 ))
+        if options["compression"] not in (None, "gzip", "lzf"):
+            raise ValueError("Invalid compression specified '{}'. "
+                             "Valid filters: 'gzip', 'lzf'.".format(
+                                 options["compression"]))
+        chunks = options["chunks"]
+        if chunks is not None and chunks is not False:
+            chunklist = chunks if isinstance(chunks, tuple) else (chunks,)
+            if not chunklist or not all(
+                    isinstance(c, (int, np.integer)) and
+                    not isinstance(c, bool) and c > 0 for c in chunklist):
+                raise ValueError("Invalid chunks specified '{}'. Chunks must "
+                                 "be a positive int, a tuple of positive "
+                                 "ints, or False.".format(chunks))
+        if options["chunks"] is False and (options["compression"] or
+                                           options["shuffle"]):
+            raise ValueError("Filters require chunked datasets. "
+                             "Contiguous storage (chunks=False) cannot be "
+                             "combined with compression or shuffle.")
+        return options
 
     def _get_or_init_metadata(self, nix_obj, path):
         """
@@ -807,11 +1723,45 @@ class NixIO(BaseIO):
 
         Example path: /block_1/segments/segment_a/events/event_a1
 
+        Resolved objects are kept in a path index, so each path is only walked
+        once per IO instance. Objects created by this IO replace the entry for
+        their path when they are written.
+
         :param path: Path string
         :return: The object at the location defined by the path
         """
         if path in ("", "/"):
             return self.nix_file
+        if path in self._path_map:
+            self._path_cache_stats["hits"] += 1
+            self._add_stats(path_cache_hits=1)
+            return self._path_map[path]
+        self._path_cache_stats["misses"] += 1
+        if getattr(self._path_resolving, "active", False):
+            # parent of a path being resolved and timed
+            obj = self._find_object_at(path)
+        else:
+            self._path_resolving.active = True
+            start = time.time()
+            try:
+                obj = self._find_object_at(path)
+            finally:
+                self._path_resolving.active = False
+            self._add_stats(path_resolutions=1,
+                            path_resolution_time=time.time() - start)
+        if not isinstance(obj, list) or len(obj):
+            self._path_map[path] = obj
+        return obj
+
+    def _find_object_at(self, path):
+        """
+        Walks the file from the root to the location defined by the path and
+        returns the object found there. See ``_get_object_at`` for the path
+        format.
+
+        :param path: Path string
+        :return: The object at the location defined by the path
+        """
         parts = path.split("/")
         if parts[0]:
             ValueError("Invalid object path: {}".format(path))
@@ -839,6 +1789,76 @@ class NixIO(BaseIO):
         parent_obj = self._get_object_at(parent_path)
         return parent_obj
 
+    @staticmethod
+    def _new_stats():
+        """
+        Returns a new dictionary of instrumentation counters (see
+        ``collect_stats``).
+        """
+        return dict.fromkeys((
+            "path_cache_hits", "path_resolutions", "path_resolution_time",
+            "datasets_created", "dataset_creation_time", "bytes_written",
+            "bytes_read", "hashes", "hash_time", "metadata_writes",
+            "metadata_write_time", "metadata_reads", "metadata_cache_hits"
+        ), 0)
+
+    def _add_stats(self, **counts):
+        """
+        Adds to the instrumentation counters if collection is enabled.
+        """
+        if self.stats is None:
+            return
+        with self._stats_lock:
+            for name, value in counts.items():
+                self.stats[name] += value
+
+    @contextmanager
+    def collect_stats(self):
+        """
+        Context manager collecting operation counts and timings of the IO
+        while it is active. It yields the dictionary of counters:
+
+        - path_cache_hits: object paths resolved from the path index
+        - path_resolutions, path_resolution_time: object paths resolved by
+          walking the file. Uncached parent paths resolved on the way are
+          included in the time of the path, not counted separately (the
+          misses of ``path_cache_info`` count every path).
+        - datasets_created, dataset_creation_time: DataArrays created for
+          data
+        - bytes_written: bytes of data stored in new DataArrays and appended
+          by streams
+        - bytes_read: bytes of data read into Neo objects
+        - hashes, hash_time: objects hashed to detect modifications
+        - metadata_writes, metadata_write_time: metadata properties written
+        - metadata_reads, metadata_cache_hits: metadata sections decoded from
+          the file and from the section cache
+
+        Times are in seconds. Counters collected inside the context are also
+        added to ``self.stats`` if collection was enabled for the IO.
+
+        :return: Dictionary of counters
+        """
+        outer = self.stats
+        self.stats = self._new_stats()
+        try:
+            yield self.stats
+        finally:
+            inner = self.stats
+            self.stats = outer
+            if outer is not None:
+                self._add_stats(**inner)
+
+    def path_cache_info(self):
+        """
+        Returns the hit and miss counts and the current size of the path index
+        used to resolve object paths.
+
+        :return: A dictionary with the keys 'hits', 'misses', and 'size'
+        """
+        info = dict(self._path_cache_stats)
+        info["size"] = len(self._path_map)
+        return info
+
     def _get_mapped_objects(self, object_list):
         return list(map(self._get_mapped_object, object_list))
 
@@ -866,10 +1886,12 @@ class NixIO(BaseIO):
             nixobj.force_created_at(calculate_timestamp(attr["created_at"]))
         if "file_datetime" in attr:
             metadata = self._get_or_init_metadata(nixobj, path)
-            metadata["file_datetime"] = self._to_value(attr["file_datetime"])
+            self._write_property(metadata, "file_datetime",
+                                 attr["file_datetime"])
         if "rec_datetime" in attr and attr["rec_datetime"]:
             metadata = self._get_or_init_metadata(nixobj, path)
-            metadata["rec_datetime"] = self._to_value(attr["rec_datetime"])
+            self._write_property(metadata, "rec_datetime",
+                                 attr["rec_datetime"])
         if "annotations" in attr:
             metadata = self._get_or_init_metadata(nixobj, path)
             self._add_annotations(attr["annotations"], metadata)
@@ -877,9 +1899,13 @@ class NixIO(BaseIO):
     def _write_data(self, nixobj, attr, path):
         if isinstance(nixobj, list):
             metadata = self._get_or_init_metadata(nixobj[0], path)
-            metadata["t_start.units"] = self._to_value(attr["t_start.units"])
+            self._write_property(metadata, "t_start.units",
+                                 attr["t_start.units"])
             for obj in nixobj:
                 obj.unit = attr["data.units"]
+                # dimensions of a rewritten signal are created again
+                if len(obj.dimensions):
+                    obj.delete_dimensions()
                 if attr["type"] == "analogsignal":
                     timedim = obj.append_sampled_dimension(
                         attr["sampling_interval"]
@@ -900,31 +1926,32 @@ class NixIO(BaseIO):
                 exttype = nixobj.type + ".durations"
                 if extname in parentblock.data_arrays:
                     del parentblock.data_arrays[extname]
-                extents = parentblock.create_data_array(
-                    extname,
-                    exttype,
-                    data=attr["extents"]
+                extents = self._create_data_array(
+                    parentblock, extname, exttype, attr["extents"]
                 )
                 extents.unit = attr["extents.units"]
                 nixobj.extents = extents
             if "labels" in attr:
+                if len(nixobj.positions.dimensions):
+                    nixobj.positions.delete_dimensions()
                 labeldim = nixobj.positions.append_set_dimension()
                 labeldim.labels = attr["labels"]
             metadata = self._get_or_init_metadata(nixobj, path)
             if "t_start" in attr:
-                metadata["t_start"] = self._to_value(attr["t_start"])
-                metadata["t_start.units"] = self._to_value(attr["t_start.units"])
+                self._write_property(metadata, "t_start", attr["t_start"])
+                self._write_property(metadata, "t_start.units",
+                                     attr["t_start.units"])
             if "t_stop" in attr:
-                metadata["t_stop"] = self._to_value(attr["t_stop"])
-                metadata["t_stop.units"] = self._to_value(attr["t_stop.units"])
+                self._write_property(metadata, "t_stop", attr["t_stop"])
+                self._write_property(metadata, "t_stop.units",
+                                     attr["t_stop.units"])
             if "waveforms" in attr:
                 wfname = nixobj.name + ".waveforms"
                 if wfname in parentblock.data_arrays:
                     del parentblock.data_arrays[wfname]
                     del nixobj.features[0]
-                wfda = parentblock.create_data_array(
-                    wfname, "neo.waveforms",
-                    data=attr["waveforms"]
+                wfda = self._create_data_array(
+                    parentblock, wfname, "neo.waveforms", attr["waveforms"]
                 )
                 wfda.unit = attr["waveforms.units"]
                 nixobj.create_feature(wfda, nixio.LinkType.Indexed)
@@ -933,9 +1960,8 @@ class NixIO(BaseIO):
                 wftime = wfda.append_sampled_dimension(
                     attr["sampling_interval"]
                 )
-                metadata["sampling_interval.units"] = self._to_value(
-                    attr["sampling_interval.units"]
-                )
+                self._write_property(metadata, "sampling_interval.units",
+                                     attr["sampling_interval.units"])
                 wftime.unit = attr["times.units"]
                 wftime.label = "time"
                 if wfname in metadata.sections:
@@ -944,33 +1970,30 @@ class NixIO(BaseIO):
                     wfpath = path + "/waveforms/" + wfname
                     wfda.metadata = self._get_or_init_metadata(wfda, wfpath)
                 if "left_sweep" in attr:
-                    wfda.metadata["left_sweep"] = self._to_value(
-                        attr["left_sweep"]
-                    )
+                    self._write_property(wfda.metadata, "left_sweep",
+                                         attr["left_sweep"])
 
     def _update_maps(self, obj, lazy):
-        objidx = self._find_lazy_loaded(obj)
-        if lazy and objidx is None:
-            self._lazy_loaded.append(obj)
-        elif not lazy and objidx is not None:
-            self._lazy_loaded.pop(objidx)
-        if not lazy:
-            self._object_hashes[obj.path] = self._hash_object(obj)
+        if not self._map_objects:
+            return
+        if lazy:
+            self._lazy_loaded.setdefault(obj.path, obj)
+        else:
+            self._lazy_loaded.pop(obj.path, None)
+            self._object_hashes[obj.path] = self._compute_hash(obj)
 
     def _find_lazy_loaded(self, obj):
         """
-        Finds the index of an object in the _lazy_loaded list by comparing the
-        path attribute. Returns None if the object is not in the list.
+        Finds a lazy loaded object in the _lazy_loaded registry by its path
+        attribute. Returns None if no object with the same path was registered.
 
         :param obj: The object to find
-        :return: The index of the object in the _lazy_loaded list or None if it
-        was not added
+        :return: The registered lazy loaded object or None if it was not added
         """
-        for idx, llobj in enumerate(self._lazy_loaded):
-            if llobj.path == obj.path:
-                return idx
-        else:
+        path = getattr(obj, "path", None)
+        if path is None:
             return None
+        return self._lazy_loaded.get(path)
 
     @classmethod
     def resolve_name_conflicts(cls, objects):
@@ -987,19 +2010,26 @@ class NixIO(BaseIO):
             if not len(objects):
                 return
             names = [obj.name for obj in objects]
+            # counts of the names in use: renamed objects and those not yet
+            # visited; a name in use stays in use, so the suffix search for
+            # each base name continues from the last suffix it assigned
+            taken = Counter(names)
+            suffixes = dict()
             for idx, cn in enumerate(names):
                 if not cn:
                     cn = cls._generate_name(objects[idx])
                 else:
-                    names[idx] = ""
-                if cn not in names:
+                    taken[cn] -= 1
+                if taken[cn] <= 0:
                     newname = cn
                 else:
-                    suffix = 1
+                    suffix = suffixes.get(cn, 0) + 1
                     newname = "{}-{}".format(cn, suffix)
-                    while newname in names:
+                    while taken[newname] > 0:
                         suffix += 1
                         newname = "{}-{}".format(cn, suffix)
+                    suffixes[cn] = suffix
+                taken[newname] += 1
                 names[idx] = newname
             for obj, n in zip(objects, names):
                 obj.name = n
@@ -1089,8 +2119,144 @@ class NixIO(BaseIO):
 
     def _add_annotations(self, annotations, metadata):
         for k, v in annotations.items():
-            v = self._to_value(v)
-            metadata[k] = v
+            self._write_property(metadata, k, v)
+
+    def _write_property(self, section, name, value):
+        """
+        Stores ``value`` as the property ``name`` of a metadata Section.
+
+        Numbers, strings, and flat sequences or arrays of them are converted
+        to an array in one step and all values of the property are written
+        with a single dataset write, or with ``Section.create_property`` if the
+        nixpy backend does not expose the property datasets. Other values are
+        converted with ``_to_value``.
+
+        :param section: The metadata Section
+        :param name: Name of the property
+        :param value: The value to be stored
+        """
+        start = time.time()
+        self._section_cache.pop(section.id, None)
+        values = self._property_array(value)
+        if values is None:
+            section[name] = self._to_value(value)
+        elif not self._write_property_array(section, name, values):
+            if name in section.props:
+                del section[name]
+            section.create_property(name, list(nixio.Value(v)
+                                               for v in values.tolist()))
+        self._add_stats(metadata_writes=1,
+                        metadata_write_time=time.time() - start)
+
+    @staticmethod
+    def _property_array(value):
+        """
+        Converts a property value to a 1-D array of one of the value types of
+        NIX properties (bool, int64, float64, or str). Returns None for
+        values that have no such representation (e.g., Quantities, dates,
+        nested or empty sequences, mixed strings and numbers); these are
+        converted with ``_to_value``.
+
+        :param value: The value to be converted
+        :return: 1-D numpy array or None
+        """
+        if isinstance(value, pq.Quantity):
+            return None
+        if not isinstance(value, (np.ndarray, list, tuple, bool, int, float,
+                                  string_types, bytes, np.generic)):
+            return None
+        if isinstance(value, (list, tuple)):
+            # numpy would convert the numbers of mixed sequences to strings
+            isstr = set(isinstance(item, (string_types, bytes))
+                        for item in value)
+            if len(isstr) > 1:
+                return None
+        values = np.asarray(value)
+        if values.ndim > 1 or not values.size:
+            return None
+        values = values.reshape(-1)
+        kind = values.dtype.kind
+        if kind == "b":
+            return values
+        if kind in "iu":
+            # unsigned values beyond the int64 range would wrap around; the
+            # bound is a uint64 since mixed comparisons are done in float64
+            if (kind == "u" and
+                    values.max() > np.uint64(np.iinfo(np.int64).max)):
+                return None
+            return values.astype(np.int64, copy=False)
+        if kind == "f":
+            return values.astype(np.float64, copy=False)
+        if kind == "S":
+            values = np.char.decode(values)
+        elif kind != "U":
+            return None
+        return values.astype(object)
+
+    @staticmethod
+    def _write_property_array(section, name, values):
+        """
+        Writes a 1-D array as the values of the property ``name`` of a metadata
+        Section with a single dataset write. An existing property of a
+        different value type is replaced.
+
+        The property datasets are not part of the public nixpy API. If the
+        nixpy backend does not provide them (see ``_property_dataset``),
+        nothing is written and False is returned.
+
+        :param section: The metadata Section
+        :param name: Name of the property
+        :param values: 1-D array returned by ``_property_array``
+        :return: True if the values were written
+        """
+        if not hasattr(section, "_h5group"):
+            return False
+        if values.dtype == object:
+            valuetype = nixio.DataType.String
+        else:
+            valuetype = values.dtype.type
+        prop = None
+        if name in section.props:
+            prop = section.props[name]
+            dataset = NixIO._property_dataset(prop)
+            if dataset is None:
+                return False
+            if dataset.dtype != prop._make_h5_dtype(valuetype):
+                del section[name]
+                prop = None
+        if prop is None:
+            prop = section.create_property(name, valuetype)
+            dataset = NixIO._property_dataset(prop)
+            if dataset is None:
+                return False
+        data = np.empty(len(values), dtype=dataset.dtype)
+        data["value"] = values
+        data["uncertainty"] = 0
+        for field in ("reference", "filename", "encoder", "checksum"):
+            data[field] = ""
+        dataset.shape = data.shape
+        dataset.write_data(data)
+        return True
+
+    @staticmethod
+    def _property_dataset(prop):
+        """
+        Returns the dataset of a Property if it can be resized and written as
+        a whole with the structured dtype of the property values (the
+        ``_h5dataset`` and ``_make_h5_dtype`` of the nixpy h5py backend).
+
+        :param prop: The Property
+        :return: The dataset or None
+        """
+        dataset = getattr(prop, "_h5dataset", None)
+        if dataset is None or not hasattr(prop, "_make_h5_dtype"):
+            return None
+        shape = getattr(type(dataset), "shape", None)
+        if not (isinstance(shape, property) and shape.fset is not None):
+            return None
+        if not (hasattr(dataset, "write_data") and hasattr(dataset, "dtype")):
+            return None
+        return dataset
 
     def _to_value(self, v):
         """
@@ -1158,19 +2324,13 @@ class NixIO(BaseIO):
             units = None
         return units
 
-    @staticmethod
-    def _nix_attr_to_neo(nix_obj):
+    def _nix_attr_to_neo(self, nix_obj):
         neo_attrs = dict()
         neo_attrs["name"] = stringify(nix_obj.name)
 
         neo_attrs["description"] = stringify(nix_obj.definition)
         if nix_obj.metadata:
-            for prop in nix_obj.metadata.props:
-                values = prop.values
-                if len(values) == 1:
-                    neo_attrs[prop.name] = values[0].value
-                else:
-                    neo_attrs[prop.name] = list(v.value for v in values)
+            neo_attrs.update(self._read_section(nix_obj.metadata))
 
         if isinstance(nix_obj, (nixtypes["Block"], nixtypes["Group"])):
             if "rec_datetime" not in neo_attrs:
@@ -1185,6 +2345,60 @@ class NixIO(BaseIO):
         # neo_attrs["file_origin"] = os.path.basename(self.filename)
         return neo_attrs
 
+    def _read_section(self, section):
+        """
+        Returns the properties of a metadata Section as a dictionary. Single
+        values are unpacked, multiple values are returned as a list.
+
+        Decoded sections are cached by section id, so sections shared by
+        several objects (e.g., the metadata of the DataArrays of a signal) are
+        read only once. The cache entry of a section is dropped when one of
+        its properties is written.
+
+        :param section: The metadata Section
+        :return: Dictionary of property names and values
+        """
+        props = self._section_cache.get(section.id)
+        if props is None:
+            props = self._read_section_props(section)
+            self._section_cache[section.id] = props
+            self._add_stats(metadata_reads=1)
+        else:
+            self._add_stats(metadata_cache_hits=1)
+        return dict((name, list(value) if isinstance(value, list) else value)
+                    for name, value in props.items())
+
+    @staticmethod
+    def _read_section_props(section):
+        """
+        Reads all properties of a metadata Section. With the h5py backend,
+        only the value field of each property dataset is read, with one read
+        per property, instead of loading each value with its uncertainty,
+        reference, and checksum fields.
+
+        :param section: The metadata Section
+        :return: Dictionary of property names and values
+        """
+        h5group = getattr(section, "_h5group", None)
+        if h5group is None:
+            props = dict()
+            for prop in section.props:
+                values = list(v.value for v in prop.values)
+                props[prop.name] = values[0] if len(values) == 1 else values
+            return props
+        props = dict()
+        if "properties" not in h5group:
+            return props
+        for name, dataset in h5group.group["properties"].items():
+            if dataset.shape and dataset.shape[0]:
+                values = dataset["value"]
+            else:
+                values = []
+            values = list(v.decode() if isinstance(v, bytes) else v
+                          for v in values)
+            props[stringify(name)] = values[0] if len(values) == 1 else values
+        return props
+
     @staticmethod
     def _group_signals(paths):
         """
@@ -1194,22 +2408,137 @@ class NixIO(BaseIO):
         :return: A list of paths (strings) of signal groups. The last part of
         each path is the common name of the signals in the group.
         """
-        grouppaths = list(".".join(p.split(".")[:-1])
-                          for p in paths)
-        # deduplicating paths
-        uniquepaths = []
-        for path in grouppaths:
-            if path not in uniquepaths:
-                uniquepaths.append(path)
-        return uniquepaths
+        # deduplicating paths, keeping the order of their first appearance
+        grouppaths = OrderedDict.fromkeys(p.rsplit(".", 1)[0] for p in paths)
+        return list(grouppaths)
+
+    @staticmethod
+    def _memmap_data(da):
+        """
+        Returns a read-only memory map of the data of a DataArray. Returns None
+        if the data cannot be mapped, i.e., if it is not stored contiguously in
+        the file (chunked or compressed datasets) or requires calibration.
+
+        :param da: A NIX DataArray
+        :return: A numpy memmap of the data or None
+        """
+        h5group = getattr(da, "_h5group", None)
+        if h5group is None:
+            return None
+        if len(da.polynom_coefficients) or da.expansion_origin:
+            return None
+        dset = h5group.group["data"]
+        if dset.chunks is not None:
+            return None
+        offset = dset.id.get_offset()
+        if offset is None:
+            return None
+        if dset.file.mode != "r":
+            dset.file.flush()
+        return np.memmap(dset.file.filename, dtype=dset.dtype, mode="r",
+                         offset=offset, shape=dset.shape)
+
+    @staticmethod
+    def _sample_index(t, t_start, sampling_period, nsamples):
+        """
+        Returns the index of the first sample at or after time ``t`` of a
+        regularly sampled signal, clipped to the range [0, nsamples]. Used for
+        both bounds of the window [t_start, t_stop), it selects the samples
+        within the window: for a ``t`` between two samples, the start index is
+        rounded up and the stop index is the one after the last sample before
+        ``t``.
+
+        :param t: Time (Quantity scalar)
+        :param t_start: Start time of the signal (Quantity scalar)
+        :param sampling_period: Sampling period of the signal (Quantity scalar)
+        :param nsamples: Number of samples in the signal
+        :return: The sample index
+        """
+        idx = ((t - t_start) / sampling_period).simplified.magnitude.item()
+        nearest = np.rint(idx)
+        if abs(idx - nearest) < 1e-9:
+            # times of samples with floating point errors
+            idx = nearest
+        idx = int(np.ceil(idx))
+        return min(max(idx, 0), nsamples)
+
+    @staticmethod
+    def _search_sorted(dataset, value, blocksize=4096):
+        """
+        Returns the index at which ``value`` would be inserted into the sorted
+        1-D ``dataset`` to keep it sorted (like ``numpy.searchsorted`` with
+        side='left'). The dataset is bisected one element at a time until the
+        remaining range fits in ``blocksize`` elements; only that block is then
+        read and searched in memory.
+
+        :param dataset: Sorted dataset (DataArray, HDF5 dataset, or array)
+        :param value: The value to search for
+        :param blocksize: Number of elements read at once at the end of the
+         search
+        :return: The insertion index
+        """
+        low, high = 0, len(dataset)
+        while high - low > blocksize:
+            mid = (low + high) // 2
+            if dataset[mid] < value:
+                low = mid + 1
+            else:
+                high = mid
+        if low == high:
+            return low
+        block = np.asarray(dataset[low:high])
+        return low + int(np.searchsorted(block, value))
 
     @staticmethod
-    def _get_referers(nix_obj, obj_list):
-        ref_list = list()
-        for ref in obj_list:
-            if nix_obj.name in list(src.name for src in ref.sources):
-                ref_list.append(ref)
-        return ref_list
+    def _dimension_dataset(dim, name):
+        """
+        Returns the HDF5 dataset that holds the ``name`` attribute (e.g.,
+        'ticks' or 'labels') of a dimension descriptor, so that it can be read
+        in parts. If the backend does not expose the dataset, the attribute is
+        read and returned as an array.
+
+        :param dim: A NIX dimension descriptor
+        :param name: Name of the dataset
+        :return: An HDF5 dataset or numpy array
+        """
+        h5group = getattr(dim, "_h5group", None)
+        if h5group is not None and name in h5group:
+            return h5group.group[name]
+        return np.asarray(getattr(dim, name))
+
+    @staticmethod
+    def _is_single_layout(nix_da_group):
+        """
+        Returns True if the group of DataArrays was written using the 'single'
+        signal layout, i.e., it consists of one 2-D DataArray holding all
+        channels of the signal.
+
+        :param nix_da_group: a list of NIX DataArray objects
+        :return: True if the signal is stored in a single 2-D DataArray
+        """
+        return len(nix_da_group) == 1 and len(nix_da_group[0].shape) == 2
+
+    def _get_referers(self, nix_obj, nix_block, container):
+        """
+        Returns the objects in the ``container`` of ``nix_block`` (e.g.,
+        'data_arrays' or 'multi_tags') which have ``nix_obj`` as a source.
+
+        The source name -> referer index of each block container is built in a
+        single pass on first use and reused for all subsequent lookups.
+
+        :param nix_obj: The NIX Source being referenced
+        :param nix_block: The NIX Block that contains the referers
+        :param container: Name of the Block container to search
+        :return: A list of objects that reference ``nix_obj``
+        """
+        key = (nix_block.id, container)
+        if key not in self._referer_index:
+            index = dict()
+            for ref in getattr(nix_block, container):
+                for srcname in set(src.name for src in ref.sources):
+                    index.setdefault(srcname, []).append(ref)
+            self._referer_index[key] = index
+        return list(self._referer_index[key].get(nix_obj.name, []))
 
     @staticmethod
     def _get_time_dimension(obj):
@@ -1218,24 +2547,83 @@ class NixIO(BaseIO):
                 return dim
         return None
 
-    @staticmethod
-    def _hash_object(obj):
+    def _compute_hash(self, obj):
+        """
+        Hashes a Neo object with the hash backend of the IO.
+
+        :param obj: A Neo object
+        :return: Hex digest
+        """
+        start = time.time()
+        digest = self._hash_object(obj, self.hash_backend)
+        self._add_stats(hashes=1, hash_time=time.time() - start)
+        return digest
+
+    @classmethod
+    def _default_hash_backend(cls):
+        """
+        Returns the first hash backend in ``_hash_backends`` that is available.
+        """
+        for backend in cls._hash_backends:
+            if backend == "xxhash":
+                if xxhash is not None:
+                    return backend
+            elif backend in hashlib.algorithms_available:
+                return backend
+        return "md5"
+
+    @classmethod
+    def _hash_factory(cls, backend=None):
+        """
+        Returns the constructor of the hash objects for a hash backend.
+        When no backend is specified, the default one is used.
+
+        :param backend: Name of the hash backend or None
+        :return: Callable returning a new hash object
+        """
+        if backend is None:
+            backend = cls._default_hash_backend()
+        if backend not in cls._hash_backends:
+            raise ValueError("Invalid hash backend specified '{}'. "
+                             "Valid backends: {}.".format(
+                                 backend, ", ".join(cls._hash_backends)))
+        if backend == "xxhash":
+            if xxhash is None:
+                raise ImportError("The 'xxhash' hash backend requires the "
+                                  "xxhash package.")
+            return xxhash.xxh64
+        if backend not in hashlib.algorithms_available:
+            raise ValueError("The '{}' hash backend is not available in "
+                             "this Python installation.".format(backend))
+        return lambda: hashlib.new(backend)
+
+    @classmethod
+    def _hash_object(cls, obj, backend=None):
         """
-        Computes an MD5 hash of a Neo object based on its attribute values and
+        Computes a hash of a Neo object based on its attribute values and
         data objects. Child objects are not counted.
 
+        Arrays are hashed in place; arrays that are not C-contiguous are
+        copied in blocks of rows of at most ``_hash_chunk_bytes``.
+
         :param obj: A Neo object
-        :return: MD5 sum
+        :param backend: Hash backend (see ``_hash_factory``)
+        :return: Hex digest
         """
-        objhash = md5()
+        objhash = cls._hash_factory(backend)()
 
         def strupdate(a):
             objhash.update(str(a).encode())
 
         def dupdate(d):
-            if isinstance(d, np.ndarray) and not d.flags["C_CONTIGUOUS"]:
-                d = d.copy(order="C")
-            objhash.update(d)
+            d = np.asarray(d)
+            if d.flags["C_CONTIGUOUS"]:
+                objhash.update(d)
+                return
+            rowbytes = d[:1].nbytes or 1
+            nrows = max(cls._hash_chunk_bytes // rowbytes, 1)
+            for start in range(0, len(d), nrows):
+                objhash.update(np.ascontiguousarray(d[start:start+nrows]))
 
         # attributes
         strupdate(obj.name)
@@ -1293,3 +2681,143 @@ class NixIO(BaseIO):
         strupdate(type(obj).__name__)
 
         return objhash.hexdigest()
+
+
+class NixSignalStream(object):
+    """
+    Appends samples to an AnalogSignal stored in a NIX file.
+    Streams are created with ``NixIO.open_signal_stream``.
+    """
+
+    def __init__(self, io, path, data_arrays, units):
+        self.path = path
+        self.units = units
+        self.nsamples = 0
+        self.closed = False
+        self._io = io
+        self._data_arrays = data_arrays
+        self._single = io._is_single_layout(data_arrays)
+        if self._single:
+            self.nchannels = data_arrays[0].shape[1]
+        else:
+            self.nchannels = len(data_arrays)
+
+    def append(self, chunk):
+        """
+        Append a chunk of samples to the end of the signal.
+
+        :param chunk: 2D array (time x channel) of samples. Quantity arrays are
+         rescaled to the units of the signal. A 1D array is treated as a
+         single channel.
+        """
+        if self.closed:
+            raise ValueError("Cannot append to closed stream "
+                             "{}.".format(self.path))
+        if isinstance(chunk, pq.Quantity):
+            chunk = chunk.rescale(self.units).magnitude
+        chunk = np.asarray(chunk)
+        if chunk.ndim == 1:
+            chunk = chunk[:, np.newaxis]
+        if chunk.shape[1] != self.nchannels:
+            raise ValueError("Chunk has {} channels. "
+                             "Signal {} has {} channels.".format(
+                                 chunk.shape[1], self.path, self.nchannels))
+        if self._single:
+            self._data_arrays[0].append(chunk)
+        else:
+            for da, channel in zip(self._data_arrays, np.transpose(chunk)):
+                da.append(channel)
+        self.nsamples += len(chunk)
+        self._io._add_stats(bytes_written=chunk.nbytes)
+
+    def close(self):
+        """
+        Close the stream. No more samples can be appended.
+        """
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class NixMultiTagStream(object):
+    """
+    Appends times (and labels) to a SpikeTrain or Event stored in a NIX file.
+    Streams are created with ``NixIO.open_spiketrain_stream`` and
+    ``NixIO.open_event_stream``.
+    """
+
+    def __init__(self, io, path, mtag, units, t_stop=None):
+        self.path = path
+        self.units = units
+        self.t_stop = t_stop
+        self.ntimes = 0
+        self.closed = False
+        self._io = io
+        self._mtag = mtag
+        self._last_time = None
+
+    def append(self, times, labels=None):
+        """
+        Append times to the end of the SpikeTrain or Event.
+
+        :param times: 1D array of times. Quantity arrays are rescaled to the
+         units of the object.
+        :param labels: Labels of the appended times (Events only). Empty
+         labels are stored if not given.
+        """
+        if self.closed:
+            raise ValueError("Cannot append to closed stream "
+                             "{}.".format(self.path))
+        if isinstance(times, pq.Quantity):
+            times = times.rescale(self.units).magnitude
+        times = np.atleast_1d(np.asarray(times, dtype=float))
+        if not len(times):
+            return
+        positions = self._mtag.positions
+        positions.append(times)
+        if len(positions.dimensions):
+            if labels is None:
+                labels = [""] * len(times)
+            labels = list(stringify(l) for l in labels)
+            labeldim = positions.dimensions[0]
+            labelsds = self._io._dimension_dataset(labeldim, "labels")
+            if isinstance(labelsds, np.ndarray):
+                # no resizable dataset: the labels are rewritten as a whole
+                labeldim.labels = (list(stringify(l) for l in labelsds) +
+                                   labels)
+            else:
+                nlabels = len(labelsds)
+                labelsds.resize((nlabels + len(times),))
+                labelsds[nlabels:] = np.array(labels, dtype=object)
+        lasttime = times.max()
+        if self._last_time is None or lasttime > self._last_time:
+            self._last_time = lasttime
+        self.ntimes += len(times)
+        self._io._add_stats(bytes_written=times.nbytes)
+
+    def close(self):
+        """
+        Close the stream. For SpikeTrains, the stored t_stop is extended to
+        the last appended spike time if the spike times exceeded it.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        if self.t_stop is None or self._last_time is None:
+            return
+        lasttime = pq.Quantity(self._last_time, self.units)
+        if lasttime > self.t_stop:
+            self.t_stop = lasttime.rescale(self.t_stop.units)
+            metadata = self._io._get_or_init_metadata(self._mtag, self.path)
+            self._io._write_property(metadata, "t_stop",
+                                     self.t_stop.magnitude.item())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,275 @@
+# Copyright (c) 2014, German Neuroinformatics Node (G-Node)
+#                     Achilleas Koutsou <achilleas.k@gmail.com>
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted under the terms of the BSD License. See
+# LICENSE file in the root of the Project.
+"""
+Benchmarks for the NixIO.
+
+The benchmarks write and read synthetic Blocks generated from a fixed random
+seed, so results of different revisions are comparable. Run as a script to
+print the results:
+
+    python -m neonix.test.benchmark_nixio [--preset tiny|small|medium|large]
+
+Block sizes can be changed with the options of the script (see ``--help``);
+``--json`` saves the results for comparisons between runs.
+"""
+
+from __future__ import print_function, division
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+
+import numpy as np
+import quantities as pq
+
+from neo.core import (Block, Segment, ChannelIndex, AnalogSignal, Event,
+                      SpikeTrain, Unit)
+
+from neonix.io.nixio import NixIO
+
+
+presets = {
+    "tiny": dict(nblocks=2, nsegments=2, nchannels=2, nsamples=100,
+                 nspiketrains=2, nspikes=10, nannotations=2),
+    "small": dict(nblocks=1, nsegments=2, nchannels=4, nsamples=10000,
+                  nspiketrains=4, nspikes=100, nannotations=5),
+    "medium": dict(nblocks=2, nsegments=5, nchannels=32, nsamples=100000,
+                   nspiketrains=32, nspikes=1000, nannotations=20),
+    "large": dict(nblocks=4, nsegments=10, nchannels=64, nsamples=1000000,
+                  nspiketrains=64, nspikes=10000, nannotations=50),
+}
+
+
+def timeit(func, repeat=3, setup=None):
+    """
+    Returns the shortest wall clock time of ``repeat`` calls of ``func``.
+    If ``setup`` is given, it is called before each call of ``func`` (outside
+    the timing) and its return value is passed to ``func``.
+    """
+    times = list()
+    for _ in range(repeat):
+        args = (setup(),) if setup is not None else ()
+        start = time.time()
+        func(*args)
+        times.append(time.time() - start)
+    return min(times)
+
+
+def generate_blocks(nblocks, nsegments, nchannels, nsamples, nspiketrains,
+                    nspikes, nannotations, seed=42):
+    """
+    Generates Blocks with random data. Each Segment holds an AnalogSignal with
+    ``nchannels`` channels, an Event, and ``nspiketrains`` SpikeTrains, each
+    assigned to a Unit of one ChannelIndex per Block. All objects carry
+    ``nannotations`` annotations.
+
+    :return: List of Neo Blocks
+    """
+    rng = np.random.RandomState(seed)
+
+    def annotations():
+        return dict(("annotation{}".format(idx), rng.random_sample())
+                    for idx in range(nannotations))
+
+    blocks = list()
+    for blkidx in range(nblocks):
+        block = Block(name="block{}".format(blkidx), **annotations())
+        chx = ChannelIndex(name="channels", index=np.arange(nchannels),
+                           **annotations())
+        block.channel_indexes.append(chx)
+        units = list(Unit(name="unit{}".format(idx), **annotations())
+                     for idx in range(nspiketrains))
+        chx.units.extend(units)
+        duration = nsamples / 1000.0
+        for segidx in range(nsegments):
+            seg = Segment(name="segment{}".format(segidx), **annotations())
+            block.segments.append(seg)
+            signal = AnalogSignal(rng.random_sample((nsamples, nchannels)),
+                                  units=pq.mV, sampling_rate=1 * pq.kHz,
+                                  name="signal", **annotations())
+            seg.analogsignals.append(signal)
+            chx.analogsignals.append(signal)
+            times = np.sort(rng.random_sample(nspikes)) * duration
+            seg.events.append(
+                Event(times=times * pq.s,
+                      labels=np.array(["event"] * nspikes, dtype="S"),
+                      name="events", **annotations())
+            )
+            for stidx, unit in enumerate(units):
+                times = np.sort(rng.random_sample(nspikes)) * duration
+                st = SpikeTrain(times=times * pq.s, t_stop=duration * pq.s,
+                                name="spiketrain{}".format(stidx),
+                                **annotations())
+                seg.spiketrains.append(st)
+                unit.spiketrains.append(st)
+        blocks.append(block)
+    return blocks
+
+
+def bench_write(blocks, filename, repeat=3, **options):
+    """
+    Measures ``write_all_blocks`` of the Blocks to a new file.
+    ``options`` are passed to the IO.
+    """
+    def write():
+        io = NixIO(filename, "ow", **options)
+        io.write_all_blocks(blocks)
+        io.nix_file.close()
+    return timeit(write, repeat)
+
+
+def bench_read(filename, cascade=True, lazy=False, repeat=3):
+    """
+    Measures ``read_all_blocks`` of a file written by ``bench_write``.
+    """
+    def read():
+        io = NixIO(filename, "ro")
+        io.read_all_blocks(cascade=cascade, lazy=lazy)
+        io.nix_file.close()
+    return timeit(read, repeat)
+
+
+def bench_partial_write(filename, repeat=3):
+    """
+    Measures rewriting a file after changing the description of one signal.
+    The file is read before each rewrite, so that unchanged objects are
+    recognised by their hashes.
+    """
+    def setup():
+        io = NixIO(filename, "rw")
+        blocks = io.read_all_blocks()
+        signal = blocks[0].segments[0].analogsignals[0]
+        signal.description = "modified {}".format(time.time())
+        return io, blocks
+
+    def write(args):
+        io, blocks = args
+        io.write_all_blocks(blocks)
+        io.nix_file.close()
+    return timeit(write, repeat, setup)
+
+
+def bench_hash_blocks(blocks, backend=None, repeat=3):
+    """
+    Measures hashing all objects of the Blocks.
+    """
+    objects = list()
+    for block in blocks:
+        objects.append(block)
+        objects.extend(block.channel_indexes)
+        for chx in block.channel_indexes:
+            objects.extend(chx.units)
+        for seg in block.segments:
+            objects.append(seg)
+            objects.extend(seg.data_children)
+
+    def hashall():
+        for obj in objects:
+            NixIO._hash_object(obj, backend)
+    return timeit(hashall, repeat)
+
+
+def bench_hash(nsamples=2000000, nchannels=16):
+    """
+    Measures the hash throughput of each available hash backend on a large
+    AnalogSignal, stored both C-contiguously and as a transposed view.
+
+    :return: List of (backend, layout, MiB/s) tuples
+    """
+    data = np.random.random((nchannels, nsamples))
+    signals = {
+        "contiguous": AnalogSignal(np.ascontiguousarray(data.T), units=pq.mV,
+                                   sampling_rate=1 * pq.kHz, copy=False),
+        "transposed": AnalogSignal(data.T, units=pq.mV,
+                                   sampling_rate=1 * pq.kHz, copy=False),
+    }
+    mib = data.nbytes / float(1 << 20)
+    results = list()
+    for backend in NixIO._hash_backends:
+        try:
+            NixIO._hash_factory(backend)
+        except (ImportError, ValueError):
+            continue
+        for layout, signal in sorted(signals.items()):
+            duration = timeit(lambda: NixIO._hash_object(signal, backend))
+            results.append((backend, layout, mib / duration))
+    return results
+
+
+def run(params, repeat=3, directory=None):
+    """
+    Runs all benchmarks on Blocks generated with ``params`` (see
+    ``generate_blocks``).
+
+    :return: Dictionary of the benchmark results in seconds, and hash
+     throughput in MiB/s
+    """
+    blocks = generate_blocks(**params)
+    fd, filename = tempfile.mkstemp(suffix=".h5", dir=directory)
+    os.close(fd)
+    results = dict()
+    try:
+        results["write"] = bench_write(blocks, filename, repeat)
+        results["write (single layout)"] = bench_write(
+            blocks, filename, repeat, signal_layout="single"
+        )
+        results["write (gzip)"] = bench_write(blocks, filename, repeat,
+                                              compression="gzip")
+        bench_write(blocks, filename, 1)
+        results["file size (MiB)"] = os.path.getsize(filename) / (1 << 20)
+        results["read"] = bench_read(filename, repeat=repeat)
+        results["read (lazy)"] = bench_read(filename, lazy=True,
+                                            repeat=repeat)
+        results["read (lazy cascade)"] = bench_read(filename, cascade="lazy",
+                                                    repeat=repeat)
+        results["partial write"] = bench_partial_write(filename, repeat)
+        results["hash"] = bench_hash_blocks(blocks, repeat=repeat)
+    finally:
+        os.remove(filename)
+    for backend, layout, rate in bench_hash():
+        results["hash {} {} (MiB/s)".format(backend, layout)] = rate
+    return results
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Run the NixIO benchmarks.")
+    parser.add_argument("--preset", choices=sorted(presets), default="small",
+                        help="Block sizes (default: small)")
+    for name in sorted(presets["small"]):
+        parser.add_argument("--" + name, type=int, default=None,
+                            help="override the preset's {}".format(name))
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="number of runs of each benchmark; the fastest "
+                             "one is reported")
+    parser.add_argument("--dir", default=None,
+                        help="directory for the benchmark file")
+    parser.add_argument("--json", default=None,
+                        help="file to save the parameters and results to")
+    args = parser.parse_args(args)
+    params = dict(presets[args.preset])
+    for name in params:
+        if getattr(args, name) is not None:
+            params[name] = getattr(args, name)
+
+    print("Parameters: " + ", ".join("{}={}".format(k, v)
+                                      for k, v in sorted(params.items())))
+    results = run(params, args.repeat, args.dir)
+    for name, value in sorted(results.items()):
+        print("  {:<32} {:12.4f}".format(name, value))
+    if args.json:
+        with open(args.json, "w") as jsonfile:
+            json.dump({"parameters": params, "results": results,
+                       "python": sys.version.split()[0]}, jsonfile, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import shutil
+import tempfile
+import unittest
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+from functools import partial
+
+from neonix.test import benchmark_nixio
+
+
+class BenchmarkTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_generate_blocks(self):
+        params = benchmark_nixio.presets["tiny"]
+        blocks = benchmark_nixio.generate_blocks(**params)
+        self.assertEqual(len(blocks), params["nblocks"])
+        for block in blocks:
+            self.assertEqual(len(block.segments), params["nsegments"])
+            for seg in block.segments:
+                self.assertEqual(seg.analogsignals[0].shape,
+                                 (params["nsamples"], params["nchannels"]))
+                self.assertEqual(len(seg.spiketrains),
+                                 params["nspiketrains"])
+
+    def test_run(self):
+        bench_hash = partial(benchmark_nixio.bench_hash, nsamples=100000,
+                             nchannels=2)
+        with mock.patch.object(benchmark_nixio, "bench_hash", bench_hash):
+            results = benchmark_nixio.run(benchmark_nixio.presets["tiny"],
+                                          repeat=1, directory=self.tmpdir)
+        for name in ("write", "write (single layout)", "write (gzip)",
+                     "read", "read (lazy)", "read (lazy cascade)",
+                     "partial write", "hash"):
+            self.assertGreater(results[name], 0)
+        self.assertGreater(results["file size (MiB)"], 0)
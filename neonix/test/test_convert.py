@@ -0,0 +1,299 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+import numpy as np
+import quantities as pq
+
+from neo.core import Block, Segment, AnalogSignal
+from neo.io.baseio import BaseIO
+
+from neonix.io.nixio import NixIO
+from neonix import convert
+
+
+class SegmentIO(BaseIO):
+    """
+    IO reading a file as a single Segment, like some of the Neo IOs.
+    """
+
+    readable_objects = [Segment]
+    name = "segment"
+
+    def __init__(self, filename, segment):
+        BaseIO.__init__(self, filename)
+        self.segment = segment
+
+    def read_segment(self, lazy=False, cascade=True):
+        return self.segment
+
+
+class ConvertTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.logfile = os.path.join(self.tmpdir, "convert.log")
+        self.datafiles = [self.write_datafile("rec{}.h5".format(idx))
+                          for idx in range(2)]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def write_datafile(self, filename, nsamples=20):
+        datafilename = os.path.join(self.tmpdir, filename)
+        block = Block(name=filename)
+        seg = Segment(name="seg")
+        block.segments.append(seg)
+        seg.analogsignals.append(
+            AnalogSignal(np.random.random((nsamples, 2)), units="mV",
+                         sampling_rate=1 * pq.kHz, name="sig")
+        )
+        io = NixIO(datafilename, "ow")
+        io.write_block(block)
+        io.nix_file.close()
+        return datafilename
+
+    def run_convert(self, *args):
+        convert.main([self.tmpdir, "-l", self.logfile, "--log-json"] +
+                     list(args))
+        with open(self.logfile) as logfd:
+            records = [json.loads(line) for line in logfd]
+        # only the records of the latest run
+        os.remove(self.logfile)
+        return dict((record["source"], record["outcome"])
+                    for record in records if "outcome" in record)
+
+    def test_convert(self):
+        outcomes = self.run_convert()
+        self.assertEqual(outcomes, dict((f, "converted")
+                                        for f in self.datafiles))
+        for datafilename in self.datafiles:
+            nixfilename = convert.nix_filename(datafilename, self.tmpdir)
+            io = NixIO(nixfilename, "ro")
+            blocks = io.read_all_blocks()
+            io.nix_file.close()
+            self.assertEqual(blocks[0].name,
+                             os.path.basename(datafilename))
+
+    def test_convert_jobs(self):
+        self.datafiles.extend(self.write_datafile("rec{}.h5".format(idx))
+                              for idx in range(2, 5))
+        outcomes = self.run_convert("-j", "2")
+        self.assertEqual(outcomes, dict((f, "converted")
+                                        for f in self.datafiles))
+        manifest = convert.load_manifest(
+            os.path.join(self.tmpdir, convert.manifestfile)
+        )
+        self.assertEqual(sorted(manifest), self.datafiles)
+        for datafilename in self.datafiles:
+            record = manifest[datafilename]
+            self.assertEqual(record["status"], "converted")
+            io = NixIO(record["output"], "ro")
+            blocks = io.read_all_blocks()
+            io.nix_file.close()
+            self.assertEqual(blocks[0].name,
+                             os.path.basename(datafilename))
+        outcomes = self.run_convert("-j", "2")
+        self.assertEqual(outcomes, dict((f, "unchanged")
+                                        for f in self.datafiles))
+
+    def test_convert_segments(self):
+        datafilename = os.path.join(self.tmpdir, "rec.seg")
+        open(datafilename, "w").close()
+        seg = Segment(name="seg")
+        seg.analogsignals.append(
+            AnalogSignal(np.random.random((20, 2)), units="mV",
+                         sampling_rate=1 * pq.kHz, name="sig")
+        )
+        reader = SegmentIO(datafilename, seg)
+        reader.read = mock.Mock()
+        reader.read_segment = mock.Mock(wraps=reader.read_segment)
+        with mock.patch.object(convert, "open_reader", return_value=reader):
+            status, nixfilename = convert.convert_file(datafilename,
+                                                       self.tmpdir)
+        self.assertEqual(status, "converted")
+        reader.read.assert_not_called()
+        self.assertEqual(reader.read_segment.call_count, 1)
+        io = NixIO(nixfilename, "ro")
+        blocks = io.read_all_blocks()
+        io.nix_file.close()
+        self.assertEqual(len(blocks), 1)
+        self.assertEqual(len(blocks[0].segments), 1)
+        np.testing.assert_almost_equal(
+            blocks[0].segments[0].analogsignals[0].magnitude,
+            seg.analogsignals[0].magnitude
+        )
+
+    def test_input_files(self):
+        self.run_convert()
+        manifestpath = os.path.join(self.tmpdir, convert.manifestfile)
+        manifest = convert.load_manifest(manifestpath)
+        os.remove(manifestpath)
+        self.assertEqual(convert.input_files(self.tmpdir, manifest),
+                         self.datafiles)
+        # outputs written with other names are known from the manifest
+        nixfilename = convert.nix_filename(self.datafiles[0], self.tmpdir)
+        renamed = os.path.join(self.tmpdir, "renamed.h5")
+        os.rename(nixfilename, renamed)
+        manifest[self.datafiles[0]]["output"] = renamed
+        self.assertEqual(convert.input_files(self.tmpdir, manifest),
+                         self.datafiles)
+        self.assertEqual(convert.input_files(self.tmpdir),
+                         self.datafiles + [renamed])
+        self.assertEqual(convert.input_files(self.tmpdir, manifest,
+                                             self.datafiles[:1]),
+                         self.datafiles[1:])
+
+    def test_rerun_skips_outputs(self):
+        self.run_convert()
+        outcomes = self.run_convert("-f")
+        self.assertEqual(sorted(outcomes), self.datafiles)
+        self.assertEqual(
+            sorted(os.listdir(self.tmpdir)),
+            sorted([convert.manifestfile] +
+                   [os.path.basename(f) for f in self.datafiles] +
+                   [os.path.basename(convert.nix_filename(f, self.tmpdir))
+                    for f in self.datafiles])
+        )
+
+    def test_unchanged_skipped(self):
+        self.run_convert()
+        outcomes = self.run_convert()
+        self.assertEqual(outcomes, dict((f, "unchanged")
+                                        for f in self.datafiles))
+        # a new modification time with the same contents
+        datafilename = self.datafiles[0]
+        stat = os.stat(datafilename)
+        os.utime(datafilename, (stat.st_atime, stat.st_mtime + 10))
+        outcomes = self.run_convert()
+        self.assertEqual(outcomes[datafilename], "unchanged")
+        outcomes = self.run_convert("-f")
+        self.assertEqual(outcomes, dict((f, "converted")
+                                        for f in self.datafiles))
+
+    def test_changed_reconverted(self):
+        self.run_convert()
+        datafilename = self.datafiles[1]
+        manifestpath = os.path.join(self.tmpdir, convert.manifestfile)
+        digest = convert.load_manifest(manifestpath)[datafilename]["digest"]
+        self.write_datafile(os.path.basename(datafilename), nsamples=30)
+        outcomes = self.run_convert()
+        self.assertEqual(outcomes, {self.datafiles[0]: "unchanged",
+                                    datafilename: "converted"})
+        record = convert.load_manifest(manifestpath)[datafilename]
+        self.assertNotEqual(record["digest"], digest)
+        self.assertEqual(record["digest"], convert.file_digest(datafilename))
+
+    def test_json_log(self):
+        badfilename = os.path.join(self.tmpdir, "bad.h5")
+        with open(badfilename, "w") as badfile:
+            badfile.write("not a NIX file")
+        convert.main([self.tmpdir, "-l", self.logfile, "--log-json"])
+        with open(self.logfile) as logfd:
+            records = [json.loads(line) for line in logfd]
+        records = dict((record["source"], record)
+                       for record in records if "source" in record)
+        self.assertEqual(sorted(records), [badfilename] + self.datafiles)
+        record = records[badfilename]
+        self.assertEqual(record["outcome"], "skipped")
+        self.assertEqual(record["level"], "INFO")
+        self.assertIsNone(record["output"])
+        self.assertEqual(record["size"], os.path.getsize(badfilename))
+        self.assertTrue(record["messages"])
+        self.assertIn("NOTICE: file {}".format(badfilename),
+                      record["messages"][0])
+        for datafilename in self.datafiles:
+            record = records[datafilename]
+            self.assertEqual(record["outcome"], "converted")
+            self.assertEqual(record["level"], "INFO")
+            self.assertEqual(record["messages"], [])
+            self.assertEqual(
+                record["output"],
+                convert.nix_filename(datafilename, self.tmpdir)
+            )
+
+    def test_setup_logging(self):
+        record = convert.file_record(self.datafiles[0])
+        info = {"duration": 0.5, "messages": ["ERROR reading file",
+                                              "      details"]}
+        for jsonlines in (False, True):
+            handler = convert.setup_logging(self.logfile, jsonlines,
+                                            capacity=2)
+            try:
+                convert.logger.info("Starting")
+                # records are buffered up to the capacity
+                self.assertFalse(os.path.exists(self.logfile))
+                convert.log_conversion(record, "failed", info)
+                with open(self.logfile) as logfd:
+                    lines = logfd.read().splitlines()
+            finally:
+                convert.logger.removeHandler(handler)
+                handler.target.close()
+                handler.close()
+            os.remove(self.logfile)
+            if jsonlines:
+                self.assertEqual(len(lines), 2)
+                entries = [json.loads(line) for line in lines]
+                self.assertEqual(entries[0]["message"], "Starting")
+                self.assertEqual(entries[0]["level"], "INFO")
+                entry = entries[1]
+                self.assertEqual(entry["level"], "ERROR")
+                self.assertEqual(entry["source"], record["source"])
+                self.assertEqual(entry["outcome"], "failed")
+                self.assertEqual(entry["size"], record["size"])
+                self.assertEqual(entry["duration"], 0.5)
+                self.assertEqual(entry["messages"], info["messages"])
+            else:
+                self.assertEqual(len(lines), 4)
+                self.assertTrue(lines[0].endswith("INFO Starting"))
+                self.assertIn("ERROR {}: failed".format(record["source"]),
+                              lines[1])
+                self.assertEqual(lines[2:],
+                                 ["    " + m for m in info["messages"]])
+
+    def test_file_record(self):
+        datafilename = self.datafiles[0]
+        record = convert.file_record(datafilename)
+        self.assertEqual(record["source"], datafilename)
+        self.assertEqual(record["size"], os.path.getsize(datafilename))
+        self.assertEqual(record["mtime"], os.path.getmtime(datafilename))
+        for key in ("digest", "output", "status"):
+            self.assertIsNone(record[key])
+
+    def test_file_digest(self):
+        datafilename = os.path.join(self.tmpdir, "data.bin")
+        with open(datafilename, "wb") as datafile:
+            datafile.write(b"neonix" * 1000)
+        digest = convert.file_digest(datafilename)
+        self.assertEqual(len(digest), 32)
+        self.assertEqual(convert.file_digest(datafilename, blocksize=7),
+                         digest)
+        with open(datafilename, "ab") as datafile:
+            datafile.write(b"!")
+        self.assertNotEqual(convert.file_digest(datafilename), digest)
+
+    def test_load_manifest(self):
+        manifestpath = os.path.join(self.tmpdir, convert.manifestfile)
+        self.assertEqual(convert.load_manifest(manifestpath), dict())
+        first = convert.file_record(self.datafiles[0])
+        second = convert.file_record(self.datafiles[1])
+        updated = dict(first, status="converted")
+        with open(manifestpath, "w") as manifestfd:
+            for record in (first, second, updated):
+                manifestfd.write(json.dumps(record) + "\n")
+            # incomplete line of an interrupted run
+            manifestfd.write(json.dumps(first)[:20])
+        manifest = convert.load_manifest(manifestpath)
+        self.assertEqual(manifest, {first["source"]: updated,
+                                    second["source"]: second})
+        # superseded records and incomplete lines are dropped
+        with open(manifestpath) as manifestfd:
+            lines = manifestfd.readlines()
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(convert.load_manifest(manifestpath), manifest)
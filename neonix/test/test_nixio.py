@@ -16,6 +16,7 @@ except ImportError:
     import mock
 import string
 import itertools
+from functools import partial
 from six import string_types
 
 import numpy as np
@@ -26,7 +27,7 @@ from neo.core import (Block, Segment, ChannelIndex, AnalogSignal,
                       IrregularlySampledSignal, Unit, SpikeTrain, Event, Epoch)
 from neo.test.iotest.common_io_test import BaseTestIO
 
-from neonix.io.nixio import NixIO
+from neonix.io.nixio import NixIO, NixSignalStream, NixMultiTagStream
 from neonix.io.nixio import nixtypes
 
 
@@ -628,6 +629,35 @@ class NixIOWriteTest(NixIOTest):
         chx.annotate(**self.rdict(3))
         self.write_and_compare([block])
 
+    def test_compact_channel_index_write(self):
+        block = Block(name=self.rword())
+        chx = ChannelIndex(name=self.rword(),
+                           index=[1, 2, 3, 5, 8, 13],
+                           channel_names=["ch" + str(i) for i in range(6)],
+                           coordinates=self.rquant((6, 3), pq.um))
+        block.channel_indexes.append(chx)
+        self.writer.write_block(block)
+
+        filename = self.filename
+        del self.writer
+        self.reader.close()
+        writer = NixIO(filename, "rw", channel_layout="compact")
+        writer.write_block(block)
+        nixsrc = writer.nix_file.blocks[0].sources[0]
+        self.assertEqual(len(nixsrc.sources), 0)
+        self.assertEqual(len(nixsrc.metadata.sections), 0)
+        del writer
+
+        self.writer = NixIO(filename, "ro")
+        self.reader = nixio.File.open(filename, nixio.FileMode.ReadOnly)
+        neochx = self.writer.read_block().channel_indexes[0]
+        np.testing.assert_equal(neochx.index, chx.index)
+        np.testing.assert_equal(neochx.channel_names,
+                                np.array(chx.channel_names, dtype="S"))
+        np.testing.assert_almost_equal(neochx.coordinates.magnitude,
+                                       chx.coordinates.magnitude)
+        self.assertEqual(neochx.coordinates.units, chx.coordinates.units)
+
     def test_signals_write(self):
         block = Block()
         seg = Segment()
@@ -668,6 +698,346 @@ class NixIOWriteTest(NixIOTest):
         )
         self.write_and_compare([block, anotherblock])
 
+    def test_single_layout_signals_write(self):
+        block = Block()
+        seg = Segment()
+        block.segments.append(seg)
+
+        asig = AnalogSignal(signal=self.rquant((10, 3), pq.mV),
+                            sampling_rate=pq.Quantity(10, "Hz"),
+                            t_start=20 * pq.ms, name="single asig")
+        seg.analogsignals.append(asig)
+        irsig = IrregularlySampledSignal(
+            signal=np.random.random((20, 4)),
+            times=self.rquant(20, pq.ms, True),
+            units=pq.A, name="single irsig"
+        )
+        seg.irregularlysampledsignals.append(irsig)
+
+        filename = "nixio_testfile_single.h5"
+        writer = NixIO(filename, "ow", signal_layout="single")
+        writer.write_block(block)
+        nixgroup = writer.nix_file.blocks[0].groups[0]
+        self.assertEqual(len(nixgroup.data_arrays), 2)
+        nixasig = nixgroup.data_arrays["single asig.0"]
+        self.assertEqual(nixasig.shape, (10, 3))
+        self.assertIsInstance(nixasig.dimensions[0],
+                              nixtypes["SampledDimension"])
+        self.assertIsInstance(nixasig.dimensions[1], nixtypes["SetDimension"])
+        del writer
+
+        reader = NixIO(filename, "ro")
+        neoseg = reader.read_block().segments[0]
+        neoasig = neoseg.analogsignals[0]
+        np.testing.assert_almost_equal(neoasig.magnitude, asig.magnitude)
+        self.assertEqual(neoasig.sampling_period, asig.sampling_period)
+        self.assertEqual(neoasig.t_start, asig.t_start)
+        neoirsig = neoseg.irregularlysampledsignals[0]
+        np.testing.assert_almost_equal(neoirsig.magnitude, irsig.magnitude)
+        np.testing.assert_almost_equal(neoirsig.times.magnitude,
+                                       irsig.times.magnitude)
+        neoblock = reader.read_block("/" + block.name, lazy=True)
+        self.assertEqual(neoblock.segments[0].analogsignals[0].lazy_shape,
+                         (10, 3))
+        del reader
+        os.remove(filename)
+
+    def test_many_channels_read(self):
+        block = Block(name="channels")
+        seg = Segment(name="seg")
+        block.segments.append(seg)
+        asig = AnalogSignal(signal=self.rquant((20, 12), pq.mV),
+                            sampling_rate=pq.Quantity(10, "Hz"),
+                            name="asig")
+        seg.analogsignals.append(asig)
+        sigpath = "/channels/segments/seg/analogsignals/asig"
+
+        filename = "nixio_testfile_channels.h5"
+        for layout in ("split", "single"):
+            writer = NixIO(filename, "ow", signal_layout=layout)
+            writer.write_block(block)
+            writer.nix_file.close()
+            reader = NixIO(filename, "ro")
+            neoasig = reader.read_block().segments[0].analogsignals[0]
+            np.testing.assert_almost_equal(neoasig.magnitude, asig.magnitude)
+            for channels in ([2], [10], [11, 2, 10]):
+                neoasig = reader.read_analogsignal(sigpath, channels=channels)
+                np.testing.assert_almost_equal(neoasig.magnitude,
+                                               asig.magnitude[:, channels])
+            reader.nix_file.close()
+        os.remove(filename)
+
+    def test_storage_options_write(self):
+        block = Block()
+        seg = Segment()
+        block.segments.append(seg)
+        asig = AnalogSignal(signal=self.rquant((100, 3), pq.mV),
+                            sampling_rate=pq.Quantity(10, "Hz"))
+        seg.analogsignals.append(asig)
+        epoch = Epoch(times=[1, 5, 10]*pq.ms, durations=[3, 3, 3]*pq.ms,
+                      labels=np.array(["a", "b", "c"]))
+        seg.epochs.append(epoch)
+        spiketrain = SpikeTrain(times=[1, 1.1, 1.2]*pq.ms, t_stop=1.5*pq.s,
+                                waveforms=self.rquant((3, 5, 10), pq.mV))
+        seg.spiketrains.append(spiketrain)
+
+        filename = "nixio_testfile_storage.h5"
+        writer = NixIO(filename, "ow", compression="gzip", shuffle=True,
+                       chunks=20)
+        writer.write_block(block)
+        nixblock = writer.nix_file.blocks[0]
+        for da in nixblock.data_arrays:
+            dset = da._h5group.group["data"]
+            self.assertEqual(dset.compression, "gzip")
+            self.assertTrue(dset.shuffle)
+            self.assertEqual(dset.chunks[0], 20)
+            self.assertEqual(dset.chunks[1:], dset.shape[1:])
+        self.compare_blocks([block], writer.nix_file.blocks)
+
+        writer.write_block(Block(name="lzf block"), compression="lzf")
+        self.assertEqual(writer._storage_options["compression"], "gzip")
+        with self.assertRaises(ValueError):
+            writer.write_block(block, compression="zip")
+
+        # data written by NIX without access to the HDF5 groups
+        block = Block(name="unfiltered block")
+        seg = Segment()
+        block.segments.append(seg)
+        seg.analogsignals.append(
+            AnalogSignal(signal=self.rquant((100, 3), pq.mV),
+                         sampling_rate=pq.Quantity(10, "Hz"))
+        )
+        seg.spiketrains.append(
+            SpikeTrain(times=[1, 1.1, 1.2]*pq.ms, t_stop=1.5*pq.s,
+                       waveforms=self.rquant((3, 5, 10), pq.mV))
+        )
+        with mock.patch.object(NixIO, "_replace_data_dataset",
+                               return_value=False) as replace:
+            writer.write_block(block, compression="lzf")
+        self.assertTrue(replace.called)
+        nixblock = writer.nix_file.blocks[block.name]
+        for da in nixblock.data_arrays:
+            self.assertIsNone(da._h5group.group["data"].compression)
+        self.compare_blocks([block], [nixblock])
+        del writer
+        os.remove(filename)
+
+    def test_chunks_validation(self):
+        for chunks in (0, -20, True, 2.5, "20", (), (20, 0), (20, None)):
+            with self.assertRaises(ValueError):
+                NixIO("nixio_testfile_chunks.h5", "ow", chunks=chunks)
+        self.assertFalse(os.path.exists("nixio_testfile_chunks.h5"))
+
+        # chunk shape tuples only apply to datasets of the same rank
+        def signal_block(name):
+            block = Block(name=name)
+            seg = Segment()
+            block.segments.append(seg)
+            seg.analogsignals.append(
+                AnalogSignal(signal=self.rquant((100, 3), pq.mV),
+                             sampling_rate=pq.Quantity(10, "Hz"))
+            )
+            seg.spiketrains.append(
+                SpikeTrain(times=[1, 1.1, 1.2]*pq.ms, t_stop=1.5*pq.s,
+                           waveforms=self.rquant((3, 5, 10), pq.mV))
+            )
+            return block
+
+        def chunk_shapes(nixblock):
+            return dict((da.type, da._h5group.group["data"].chunks)
+                        for da in nixblock.data_arrays)
+
+        self.writer.write_block(signal_block("chunked"), chunks=(20,))
+        chunks = chunk_shapes(self.reader.blocks["chunked"])
+        self.assertEqual(chunks["neo.analogsignal"], (20,))
+        self.assertEqual(chunks["neo.spiketrain.times"], (20,))
+        self.assertEqual(chunks["neo.waveforms"][1:], (5, 10))
+        with self.assertRaises(ValueError):
+            self.writer.write_block(signal_block("negative"),
+                                    chunks=(-20,))
+
+        filename = "nixio_testfile_chunks.h5"
+        writer = NixIO(filename, "ow", signal_layout="single",
+                       chunks=(20, 3))
+        writer.write_block(signal_block("rank"))
+        chunks = chunk_shapes(writer.nix_file.blocks["rank"])
+        self.assertEqual(chunks["neo.analogsignal"], (20, 3))
+        self.assertEqual(len(chunks["neo.spiketrain.times"]), 1)
+        self.assertEqual(chunks["neo.waveforms"][1:], (5, 10))
+        del writer
+        os.remove(filename)
+
+    def test_mmap_read(self):
+        block = Block()
+        seg = Segment()
+        block.segments.append(seg)
+        asig = AnalogSignal(signal=self.rquant((50, 4), pq.mV),
+                            sampling_rate=pq.Quantity(10, "Hz"))
+        seg.analogsignals.append(asig)
+
+        filename = "nixio_testfile_mmap.h5"
+        writer = NixIO(filename, "ow", signal_layout="single", chunks=False)
+        writer.write_block(block)
+        nixda = writer.nix_file.blocks[0].data_arrays[0]
+        self.assertIsNone(nixda._h5group.group["data"].chunks)
+        with self.assertRaises(ValueError):
+            writer.write_block(block, compression="gzip")
+        del writer
+
+        reader = NixIO(filename, "ro", mmap=True)
+        neoasig = reader.read_block().segments[0].analogsignals[0]
+        np.testing.assert_almost_equal(neoasig.magnitude, asig.magnitude)
+        base = neoasig
+        while base is not None and not isinstance(base, np.memmap):
+            base = base.base
+        self.assertIsInstance(base, np.memmap)
+        self.assertFalse(neoasig.flags["WRITEABLE"])
+        del reader
+        os.remove(filename)
+
+    def test_lazy_block_write(self):
+        block = Block(name="lazy block")
+        seg = Segment()
+        block.segments.append(seg)
+        seg.analogsignals.append(
+            AnalogSignal(signal=self.rquant((100, 3), pq.mV),
+                         sampling_rate=pq.kHz)
+        )
+        seg.spiketrains.append(
+            SpikeTrain(times=self.rquant(10, pq.s, True), t_stop=10 * pq.s)
+        )
+
+        filename = "nixio_testfile_lazysource.h5"
+        sourceio = NixIO(filename, "ow")
+        sourceio.write_block(block)
+        lazyblock = sourceio.read_block("/lazy block", lazy=True)
+        self.assertEqual(len(lazyblock.segments[0].analogsignals[0]), 0)
+        nmapped = len(sourceio._object_map)
+        nlazy = len(sourceio._lazy_loaded)
+        hashes = dict(sourceio._object_hashes)
+        loader = mock.Mock(
+            wraps=partial(sourceio.load_lazy_object, register=False)
+        )
+        self.writer.write_block(lazyblock, loader=loader)
+        self.assertEqual(loader.call_count, 2)
+        # the source IO keeps no reference to the loaded objects
+        self.assertEqual(len(sourceio._object_map), nmapped)
+        self.assertEqual(len(sourceio._lazy_loaded), nlazy)
+        self.assertEqual(sourceio._object_hashes, hashes)
+        self.compare_blocks([block], self.reader.blocks)
+        sourceio.nix_file.close()
+        os.remove(filename)
+
+    def test_append_segment(self):
+        segments = list()
+        for _ in range(2):
+            seg = Segment(name="seg")
+            seg.analogsignals.append(
+                AnalogSignal(signal=self.rquant((20, 2), pq.mV),
+                             sampling_rate=pq.kHz, name="sig")
+            )
+            seg.events.append(Event(times=self.rquant(5, pq.s, True),
+                                    labels=np.array(["a"] * 5), name="sig"))
+            segments.append(seg)
+        paths = list(self.writer.append_segment(seg, "appended")
+                     for seg in segments)
+        self.assertEqual(paths, ["/appended/segments/seg",
+                                 "/appended/segments/seg-1"])
+        names = list(obj.name for seg in segments
+                     for obj in seg.data_children)
+        self.assertEqual(len(set(names)), 4)
+        block = Block(name="appended")
+        block.segments.extend(segments)
+        self.compare_blocks([block], self.reader.blocks)
+        nixgroup = self.reader.blocks[0].groups["seg-1"]
+        self.assertEqual(list(nixgroup.multi_tags[0].references),
+                         list(nixgroup.data_arrays))
+
+    def test_collect_stats(self):
+        block = Block(name="stats block")
+        seg = Segment(name="stats seg", **self.rdict(3))
+        block.segments.append(seg)
+        asig = AnalogSignal(signal=self.rquant((100, 3), pq.mV),
+                            sampling_rate=pq.kHz)
+        seg.analogsignals.append(asig)
+
+        self.assertIsNone(self.writer.stats)
+        with self.writer.collect_stats() as stats:
+            self.writer.write_block(block)
+        self.assertIsNone(self.writer.stats)
+        self.assertEqual(stats["datasets_created"], 3)
+        self.assertEqual(stats["bytes_written"], asig.nbytes)
+        self.assertEqual(stats["hashes"], 3)
+        self.assertGreaterEqual(stats["metadata_writes"], 3)
+        self.assertGreater(stats["path_resolutions"], 0)
+        self.assertEqual(stats["bytes_read"], 0)
+
+        with self.writer.collect_stats() as stats:
+            self.writer.read_block("/stats block")
+        self.assertEqual(stats["bytes_read"], asig.nbytes)
+        self.assertEqual(stats["datasets_created"], 0)
+
+    def test_streams_write(self):
+        chunks = list(self.rquant((25, 3), pq.mV) for _ in range(4))
+        with self.writer.open_signal_stream("stream block", "stream seg",
+                                            "stream asig", 3, 1 * pq.kHz,
+                                            units=pq.mV) as stream:
+            self.assertIsInstance(stream, NixSignalStream)
+            for chunk in chunks:
+                stream.append(chunk)
+        self.assertEqual(stream.nsamples, 100)
+        with self.assertRaises(ValueError):
+            stream.append(chunks[0])
+
+        spikes = self.writer.open_spiketrain_stream("stream block",
+                                                    "stream seg",
+                                                    "stream spikes",
+                                                    t_stop=1 * pq.s)
+        self.assertIsInstance(spikes, NixMultiTagStream)
+        spikes.append([0.1, 0.5, 0.9] * pq.s)
+        spikes.append([1200, 1500] * pq.ms)
+        spikes.close()
+
+        events = self.writer.open_event_stream("stream block", "stream seg",
+                                               "stream events")
+        events.append([1, 2] * pq.s, labels=["a", "b"])
+        events.append([3] * pq.s)
+        events.close()
+
+        # the labels are written as a whole when there is no labels dataset
+        fallback = self.writer.open_event_stream("stream block", "stream seg",
+                                                 "fallback events")
+        fbmtag = self.writer._get_object_at(fallback.path)
+        del fbmtag.positions.dimensions[0]._h5group.group["labels"]
+        fallback.append([1] * pq.s, labels=["a"])
+        fallback.append([2, 3] * pq.s, labels=["b", "c"])
+        fallback.close()
+
+        with self.assertRaises(ValueError):
+            self.writer.open_event_stream("stream block", "stream seg",
+                                          "stream events")
+        # hashes of the empty objects are not kept
+        for path in (stream.path, spikes.path, events.path):
+            nixobj = self.writer._get_object_at(path)
+            self.assertIsNone(self.writer._get_stored_hash(nixobj))
+
+        segment = self.writer.read_block("/stream block").segments[0]
+        asig = segment.analogsignals[0]
+        np.testing.assert_almost_equal(asig.magnitude,
+                                       np.concatenate(chunks).magnitude)
+        self.assertEqual(asig.sampling_rate, 1 * pq.kHz)
+        spiketrain = segment.spiketrains[0]
+        np.testing.assert_almost_equal(spiketrain.times.magnitude,
+                                       [0.1, 0.5, 0.9, 1.2, 1.5])
+        self.assertEqual(spiketrain.t_stop, 1.5 * pq.s)
+        neoevents = dict((ev.name, ev) for ev in segment.events)
+        event = neoevents["stream events"]
+        np.testing.assert_almost_equal(event.times.magnitude, [1, 2, 3])
+        self.assertEqual(list(event.labels), [b"a", b"b", b""])
+        event = neoevents["fallback events"]
+        np.testing.assert_almost_equal(event.times.magnitude, [1, 2, 3])
+        self.assertEqual(list(event.labels), [b"a", b"b", b"c"])
+
     def test_epoch_write(self):
         block = Block()
         seg = Segment()
@@ -714,6 +1084,35 @@ class NixIOWriteTest(NixIOTest):
         spiketrain.left_sweep = np.random.random(10)*pq.ms
         self.write_and_compare([block])
 
+    def test_references_write(self):
+        block = Block(name="refs block")
+        seg = Segment(name="refs seg")
+        block.segments.append(seg)
+        chx = ChannelIndex(name="refs chx", index=[0, 1])
+        block.channel_indexes.append(chx)
+        unit = Unit(name="refs unit")
+        chx.units.append(unit)
+        for idx in range(2):
+            asig = AnalogSignal(signal=self.rquant((10, 2), pq.mV),
+                                sampling_rate=pq.Quantity(10, "Hz"),
+                                name="asig{}".format(idx))
+            seg.analogsignals.append(asig)
+            chx.analogsignals.append(asig)
+        seg.events.append(Event(times=[1, 2]*pq.s, name="refs event"))
+        st = SpikeTrain(times=[3, 4]*pq.s, t_stop=10.0, name="refs st")
+        seg.spiketrains.append(st)
+        unit.spiketrains.append(st)
+
+        # writing again must not duplicate references
+        self.write_and_compare([block])
+        self.write_and_compare([block])
+        group = self.io.nix_file.blocks[0].groups[0]
+        self.assertEqual(len(group.data_arrays), 4)
+        self.assertEqual(len(group.multi_tags["refs event"].references), 4)
+        self.assertEqual(len(group.multi_tags["refs st"].sources), 2)
+        for da in group.data_arrays:
+            self.assertEqual(len(da.sources), 1)
+
     def test_metadata_structure_write(self):
         neoblk = self.create_all_annotated()
         self.io.write_block(neoblk)
@@ -784,6 +1183,115 @@ class NixIOWriteTest(NixIOTest):
         self.writer.write_all_blocks(blocks)
         self.compare_blocks(blocks, self.reader.blocks)
 
+    def test_resolve_name_conflicts(self):
+        names = ["a", None, "a", "a-1", None, "neo.Event-1", "a", None]
+        events = list(Event(times=[1]*pq.s, name=n) for n in names)
+        NixIO.resolve_name_conflicts(events)
+        self.assertEqual([ev.name for ev in events],
+                         ["a-2", "neo.Event", "a-3", "a-1", "neo.Event-2",
+                          "neo.Event-1", "a", "neo.Event-3"])
+
+        spiketrains = list(SpikeTrain(times=[1]*pq.s, t_stop=2)
+                           for _ in range(1000))
+        NixIO.resolve_name_conflicts(spiketrains)
+        self.assertEqual([st.name for st in spiketrains],
+                         ["neo.SpikeTrain"] +
+                         ["neo.SpikeTrain-{}".format(idx)
+                          for idx in range(1, 1000)])
+
+    def test_parallel_write(self):
+        blocks = list()
+        for blkidx in range(3):
+            blk = Block(name="block{}".format(blkidx))
+            for segidx in range(2):
+                seg = Segment()
+                blk.segments.append(seg)
+                seg.analogsignals.append(
+                    AnalogSignal(signal=self.rquant((100, 3), pq.mV),
+                                 sampling_rate=pq.kHz)
+                )
+                labels = np.array(self.rsentence(10).split(" "))
+                seg.events.append(Event(times=self.rquant(10, pq.s),
+                                        labels=labels))
+                seg.spiketrains.append(
+                    SpikeTrain(times=self.rquant(10, pq.s, True),
+                               t_stop=10 * pq.s, units=pq.s)
+                )
+            blocks.append(blk)
+        self.writer._prepare_object = mock.Mock(
+            wraps=self.writer._prepare_object
+        )
+        inflight = list()
+        write_object = self.writer._write_object
+
+        def count_inflight(*args, **kwargs):
+            inflight.append(len(self.writer._prepared))
+            return write_object(*args, **kwargs)
+
+        self.writer._write_object = count_inflight
+        self.writer.write_all_blocks(blocks, jobs=2)
+        # per block: the block, 2 segments, and 3 objects per segment
+        self.assertEqual(self.writer._prepare_object.call_count, 3 * 9)
+        self.assertEqual(self.writer._prepared, dict())
+        self.assertEqual(max(inflight), 2 * 2)
+        self.compare_blocks(blocks, self.reader.blocks)
+
+    def test_annotations_bulk_write(self):
+        annotations = {"int": 10, "float": 1.5, "bool": True,
+                       "str": self.rword(), "bytes": b"bytes",
+                       "floats": np.random.random(100),
+                       "ints": list(range(50)),
+                       "strs": self.rsentence(5).split(" "),
+                       "date": self.rdate()}
+        block = Block(name="annotated block", **annotations)
+        self.writer.write_block(block)
+        nixmd = self.reader.blocks[0].metadata
+        self.assertEqual(nixmd["int"], 10)
+        self.assertEqual(nixmd["float"], 1.5)
+        self.assertEqual(nixmd["bool"], True)
+        self.assertEqual(nixmd["str"], annotations["str"])
+        self.assertEqual(nixmd["bytes"], "bytes")
+        np.testing.assert_almost_equal(nixmd["floats"], annotations["floats"])
+        self.assertEqual(nixmd["ints"], annotations["ints"])
+        self.assertEqual(nixmd["strs"], annotations["strs"])
+        self.assertEqual(datetime.fromtimestamp(nixmd["date"]),
+                         annotations["date"])
+
+        # rewrite with changed value types and lengths
+        block.annotations["int"] = "ten"
+        block.annotations["floats"] = [0.5, 0.25]
+        self.writer.write_block(block)
+        self.assertEqual(nixmd["int"], "ten")
+        self.assertEqual(nixmd["floats"], [0.5, 0.25])
+
+        # unsigned values beyond the int64 range are not written in bulk
+        small = np.array([1, 2], dtype=np.uint64)
+        self.assertEqual(NixIO._property_array(small).dtype, np.int64)
+        large = np.array([1, np.iinfo(np.uint64).max], dtype=np.uint64)
+        self.assertIsNone(NixIO._property_array(large))
+        large = np.array([1, 2**63 + 1], dtype=np.uint64)
+        self.assertIsNone(NixIO._property_array(large))
+        self.assertIsNone(NixIO._property_array(np.uint64(2**63 + 1)))
+
+        # mixed strings and numbers are not converted to strings
+        self.assertIsNone(NixIO._property_array(["a", 1]))
+        self.assertIsNone(NixIO._property_array((1.5, b"b")))
+        self.assertEqual(list(NixIO._property_array(["a", b"b"])), ["a", "b"])
+
+    def test_annotations_public_write(self):
+        # nixpy backends without property datasets
+        with mock.patch.object(NixIO, "_property_dataset",
+                               return_value=None):
+            self.test_annotations_bulk_write()
+        # properties written through the public API are replaced
+        block = self.io.read_block()
+        block.annotations["ints"] = [1.5]
+        block.annotations["strs"] = 7
+        self.writer.write_block(block)
+        nixmd = self.reader.blocks[0].metadata
+        self.assertEqual(nixmd["ints"], 1.5)
+        self.assertEqual(nixmd["strs"], 7)
+
     def test_to_value(self):
         section = self.io.nix_file.create_section("Metadata value test", "Test")
         tovalue = self.io._to_value
@@ -930,6 +1438,211 @@ class NixIOReadTest(NixIOTest):
             nix_block = self.io.nix_file.blocks[block.name]
             self.compare_attr(block, nix_block)
 
+    def test_analogsignal_window_read(self):
+        blk = self.io.nix_file.blocks[0]
+        group = blk.groups[0]
+        da = next(da for da in group.data_arrays
+                  if da.type == "neo.analogsignal")
+        sigpath = "/{}/segments/{}/analogsignals/{}".format(
+            blk.name, group.name, ".".join(da.name.split(".")[:-1])
+        )
+        fullsig = self.io.read_analogsignal(sigpath)
+        # t_start = 10 ms, sampling period = 0.01 ms, 100 samples
+        window = self.io.read_analogsignal(sigpath, t_start=10.2 * pq.ms,
+                                           t_stop=10.5 * pq.ms)
+        self.assertEqual(np.shape(window), (30, 3))
+        np.testing.assert_almost_equal(window.magnitude,
+                                       fullsig.magnitude[20:50])
+        self.assertAlmostEqual(window.t_start.rescale(pq.ms).magnitude.item(),
+                               10.2)
+        self.assertEqual(window.sampling_period, fullsig.sampling_period)
+
+        # bounds between samples
+        window = self.io.read_analogsignal(sigpath, t_start=10.203 * pq.ms,
+                                           t_stop=10.493 * pq.ms)
+        self.assertEqual(np.shape(window), (29, 3))
+        np.testing.assert_almost_equal(window.magnitude,
+                                       fullsig.magnitude[21:50])
+        self.assertAlmostEqual(window.t_start.rescale(pq.ms).magnitude.item(),
+                               10.21)
+
+        channels = self.io.read_analogsignal(sigpath, t_stop=10.1 * pq.ms,
+                                             channels=[2, 0])
+        np.testing.assert_almost_equal(channels.magnitude,
+                                       fullsig.magnitude[:10, [2, 0]])
+
+        outside = self.io.read_analogsignal(sigpath, t_start=1 * pq.s)
+        self.assertEqual(np.shape(outside), (0, 3))
+
+    def test_irregularsignal_window_read(self):
+        blk = self.io.nix_file.blocks[0]
+        group = blk.groups[0]
+        da = next(da for da in group.data_arrays
+                  if da.type == "neo.irregularlysampledsignal")
+        sigpath = "/{}/segments/{}/irregularlysampledsignals/{}".format(
+            blk.name, group.name, ".".join(da.name.split(".")[:-1])
+        )
+        fullsig = self.io.read_irregularlysampledsignal(sigpath)
+        times = fullsig.times
+        t_start, t_stop = times[50], times[120]
+        window = self.io.read_irregularlysampledsignal(
+            sigpath, t_start=t_start, t_stop=t_stop
+        )
+        self.assertEqual(np.shape(window), (70, 10))
+        np.testing.assert_almost_equal(window.times.magnitude,
+                                       times.magnitude[50:120])
+        np.testing.assert_almost_equal(window.magnitude,
+                                       fullsig.magnitude[50:120])
+
+        ticks = np.sort(np.random.random(10000))
+        for value in (-1, ticks[0], ticks[5000], 0.5, ticks[-1], 2):
+            self.assertEqual(NixIO._search_sorted(ticks, value, 100),
+                             np.searchsorted(ticks, value))
+
+    def test_eest_window_read(self):
+        blk = self.io.nix_file.blocks[0]
+        group = blk.groups[0]
+        for mtag in group.multi_tags:
+            neotype = mtag.type.split(".")[-1]
+            mtpath = "/{}/segments/{}/{}s/{}".format(blk.name, group.name,
+                                                    neotype, mtag.name)
+            full = self.io.get(mtpath, cascade=False, lazy=False)
+            if not len(full) or np.any(np.diff(full.times.magnitude) < 0):
+                continue
+            first, last = len(full) // 4, len(full) // 2
+            t_start, t_stop = full.times[first], full.times[last]
+            read_func = getattr(self.io, "read_" + neotype)
+            window = read_func(mtpath, t_start=t_start, t_stop=t_stop)
+            np.testing.assert_almost_equal(window.times.magnitude,
+                                           full.times.magnitude[first:last])
+            if isinstance(full, (Epoch, Event)):
+                np.testing.assert_array_equal(window.labels,
+                                              full.labels[first:last])
+            if isinstance(full, Epoch):
+                np.testing.assert_almost_equal(
+                    window.durations.magnitude,
+                    full.durations.magnitude[first:last]
+                )
+            if isinstance(full, SpikeTrain):
+                self.assertEqual(window.t_start, t_start)
+                self.assertEqual(window.t_stop, t_stop)
+                if full.waveforms is not None:
+                    np.testing.assert_almost_equal(
+                        window.waveforms.magnitude,
+                        full.waveforms.magnitude[first:last]
+                    )
+
+    def test_eest_empty_window_read(self):
+        blk = self.io.nix_file.blocks[0]
+        group = blk.groups[0]
+        for mtag in group.multi_tags:
+            neotype = mtag.type.split(".")[-1]
+            mtpath = "/{}/segments/{}/{}s/{}".format(blk.name, group.name,
+                                                    neotype, mtag.name)
+            full = self.io.get(mtpath, cascade=False, lazy=False)
+            gaps = np.flatnonzero(np.diff(full.times.magnitude) > 0)
+            if not len(gaps) or np.any(np.diff(full.times.magnitude) < 0):
+                continue
+            # a window between two consecutive times
+            idx = gaps[0]
+            gap = full.times[idx + 1] - full.times[idx]
+            t_start = full.times[idx] + gap / 3
+            t_stop = full.times[idx] + 2 * gap / 3
+            read_func = getattr(self.io, "read_" + neotype)
+            window = read_func(mtpath, t_start=t_start, t_stop=t_stop)
+            self.assertEqual(len(window), 0)
+            self.assertEqual(window.times.units, full.times.units)
+            if isinstance(full, (Epoch, Event)):
+                self.assertEqual(len(window.labels), 0)
+            if isinstance(full, Epoch):
+                self.assertEqual(len(window.durations), 0)
+            if isinstance(full, SpikeTrain) and full.waveforms is not None:
+                self.assertEqual(len(window.waveforms), 0)
+
+    def test_path_resolution_stats(self):
+        blk = self.io.nix_file.blocks[0]
+        mtag = blk.groups[0].multi_tags[0]
+        path = "/{}/segments/{}/{}s/{}".format(
+            blk.name, blk.groups[0].name, mtag.type.split(".")[-1], mtag.name
+        )
+        io = NixIO(self.filename, "ro")
+        with io.collect_stats() as stats:
+            self.assertEqual(io._get_object_at(path), mtag)
+        # the block and segment are resolved within the time of the path
+        self.assertEqual(io.path_cache_info()["misses"], 3)
+        self.assertEqual(stats["path_resolutions"], 1)
+        self.assertGreater(stats["path_resolution_time"], 0)
+        with io.collect_stats() as stats:
+            io._get_object_at(path)
+        self.assertEqual(stats["path_resolutions"], 0)
+        self.assertEqual(stats["path_cache_hits"], 1)
+        io.nix_file.close()
+
+    def test_path_cache(self):
+        self.io.read_all_blocks(cascade=True, lazy=False)
+        info = self.io.path_cache_info()
+        self.assertGreater(info["misses"], 0)
+        self.assertEqual(info["size"], info["misses"])
+
+        self.io.read_all_blocks(cascade=True, lazy=False)
+        newinfo = self.io.path_cache_info()
+        self.assertEqual(newinfo["misses"], info["misses"])
+        self.assertGreater(newinfo["hits"], info["hits"])
+
+        blk = self.io.nix_file.blocks[0]
+        sigpath = "/{}/segments/{}/analogsignals/{}".format(
+            blk.name, blk.groups[0].name,
+            ".".join(blk.groups[0].data_arrays[0].name.split(".")[:-1])
+        )
+        self.assertEqual(self.io._get_object_at(sigpath),
+                         self.io._find_object_at(sigpath))
+
+    def test_group_signals(self):
+        sigpath = "/blk/segments/seg/analogsignals/"
+        paths = list(sigpath + "{}.{}".format(name, idx)
+                     for name in ("sig.b", "sig.a", "sig") for idx in range(3))
+        paths.append(sigpath + "sig.b.3")
+        self.assertEqual(NixIO._group_signals(paths),
+                         [sigpath + "sig.b", sigpath + "sig.a",
+                          sigpath + "sig"])
+
+    def test_section_cache(self):
+        blk = self.io.nix_file.blocks[0]
+        section = blk.data_arrays[0].metadata
+        expected = dict()
+        for prop in section.props:
+            values = list(v.value for v in prop.values)
+            expected[prop.name] = values[0] if len(values) == 1 else values
+        with self.io.collect_stats() as stats:
+            self.assertEqual(self.io._read_section(section), expected)
+            props = self.io._read_section(section)
+            self.assertEqual(props, expected)
+        self.assertEqual(stats["metadata_reads"], 1)
+        self.assertEqual(stats["metadata_cache_hits"], 1)
+        # returned dictionaries are copies of the cached one
+        props.clear()
+        self.assertEqual(self.io._read_section(section), expected)
+
+    def test_get_referers(self):
+        for blk in self.io.nix_file.blocks:
+            for src in blk.sources:
+                for container in ("data_arrays", "multi_tags"):
+                    expected = list(
+                        ref for ref in getattr(blk, container)
+                        if src.name in list(s.name for s in ref.sources)
+                    )
+                    referers = self.io._get_referers(src, blk, container)
+                    self.assertEqual(list(r.id for r in referers),
+                                     list(r.id for r in expected))
+                for unit in src.sources:
+                    expected = list(
+                        mt for mt in blk.multi_tags
+                        if unit.name in list(s.name for s in mt.sources)
+                    )
+                    referers = self.io._get_referers(unit, blk, "multi_tags")
+                    self.assertEqual(list(r.id for r in referers),
+                                     list(r.id for r in expected))
+
     def test_lazy_load_subschema(self):
         blk = self.io.nix_file.blocks[0]
         segpath = "/" + blk.name + "/segments/" + blk.groups[0].name
@@ -1039,6 +1752,26 @@ class NixIOHashTest(NixIOTest):
                     self.rword(): lambda: self.rquant((10, 10), pq.mV)}
         self._hash_test(SpikeTrain, argfuncs)
 
+    def test_hash_backends(self):
+        data = self.rquant((1000, 5), pq.mV)
+        sig_c = AnalogSignal(data, sampling_rate=1 * pq.kHz, name="sig")
+        sig_f = AnalogSignal(np.asfortranarray(data), units=pq.mV,
+                             sampling_rate=1 * pq.kHz, name="sig", copy=False)
+        for backend in NixIO._hash_backends:
+            try:
+                NixIO._hash_factory(backend)
+            except (ImportError, ValueError):
+                continue
+            with mock.patch.object(NixIO, "_hash_chunk_bytes", 100):
+                self.assertEqual(self.hash(sig_c, backend),
+                                 self.hash(sig_f, backend))
+        self.assertEqual(self.hash(sig_c), self.hash(sig_f))
+        with self.assertRaises(ValueError):
+            NixIO._hash_factory("crc32")
+        with mock.patch("hashlib.algorithms_available", {"md5"}):
+            with self.assertRaises(ValueError):
+                NixIO._hash_factory("blake2b")
+
 
 class NixIOPartialWriteTest(NixIOTest):
 
@@ -1128,6 +1861,63 @@ class NixIOPartialWriteTest(NixIOTest):
         self.assertEqual(callcount, len(self.io._object_hashes))
         self.compare_blocks(self.neo_blocks, self.io.nix_file.blocks)
 
+    def test_stored_hashes(self):
+        # first write in a new session hashes the stored objects once
+        self.io._object_hashes.clear()
+        self.io.write_all_blocks(self.neo_blocks)
+        for nixblock in self.io.nix_file.blocks:
+            self.assertIsNotNone(self.io._get_stored_hash(nixblock))
+
+        # subsequent sessions use the stored digests
+        self.io._object_hashes.clear()
+        self.io.get = mock.Mock(wraps=self.io.get)
+        self.io._write_attr_annotations = mock.Mock(
+            wraps=self.io._write_attr_annotations
+        )
+        self.io.write_all_blocks(self.neo_blocks)
+        self.io.get.assert_not_called()
+        self.io._write_attr_annotations.assert_not_called()
+
+    def test_stored_hash_backend(self):
+        def ndims():
+            return list(len(da.dimensions) for blk in self.io.nix_file.blocks
+                        for da in blk.data_arrays)
+
+        self.io._object_hashes.clear()
+        self.io.write_all_blocks(self.neo_blocks)
+        dims = ndims()
+
+        def available(backend):
+            try:
+                NixIO._hash_factory(backend)()
+            except (ImportError, ValueError):
+                return False
+            return True
+
+        # hashes of another backend are unknown, not modifications
+        backends = list(b for b in NixIO._hash_backends
+                        if b != self.io.hash_backend and available(b))
+        if backends:
+            backend = backends[0]
+            self.io.hash_backend = backend
+            self.io._object_hashes.clear()
+            self.io._write_attr_annotations = mock.Mock(
+                wraps=self.io._write_attr_annotations
+            )
+            self.io.write_all_blocks(self.neo_blocks)
+            self.io._write_attr_annotations.assert_not_called()
+            nixblock = self.io.nix_file.blocks[0]
+            self.assertTrue(nixblock._h5group.get_attr("neo_hash")
+                            .startswith(backend + ":"))
+            self.assertEqual(ndims(), dims)
+
+        # rewriting modified objects replaces their dimensions
+        self.restore_methods()
+        self.modify_objects(self.neo_blocks)
+        self.io.write_all_blocks(self.neo_blocks)
+        self.assertEqual(ndims(), dims)
+        self.compare_blocks(self.neo_blocks, self.io.nix_file.blocks)
+
 
 class CommonTests(BaseTestIO, unittest.TestCase):
 